@@ -0,0 +1,611 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import core
+from core import calculate_priority_score, encode_feedback
+from decayed_scores import DecayedScores, direct_decayed_aggregates
+import jsonl_source
+
+FEEDBACK_COLUMNS = ["Category", "Sentiment", "Date", "Feedback", "User_ID", "Platform", "Priority"]
+FEEDBACK_TEXT = [
+    "Cannot login with Google account",
+    "App crashes when opening large files",
+    "Payment keeps declining, very frustrating!",
+    "Search is slow, sometimes returns nothing",
+    "Love the new dashboard",
+    "Export to CSV would be great",
+]
+MALFORMED_KINDS = ["extra_fields", "truncated", "bad_date", "stray_quote"]
+
+
+def legacy_priority_score(df):
+    # calculate_priority_score as it was before the grouped engine, kept verbatim as the
+    # reference result.
+    priority_data = []
+
+    for category in df["Category"].unique():
+        cat_df = df[df["Category"] == category]
+
+        frequency = len(cat_df)
+
+        negative_count = len(cat_df[cat_df["Sentiment"].str.lower() == "negative"])
+        sentiment_score = (negative_count / frequency) * 100 if frequency > 0 else 0
+
+        if "Date" in cat_df.columns:
+            avg_days_old = (datetime.now() - pd.to_datetime(cat_df["Date"]).mean()).days
+            recency_score = max(0, 100 - avg_days_old * 3)
+        else:
+            recency_score = 50
+
+        priority_score = (frequency * 0.4) + (sentiment_score * 0.4) + (recency_score * 0.2)
+
+        if priority_score > 70:
+            urgency = "🔴 Critical"
+        elif priority_score > 50:
+            urgency = "🟡 High"
+        elif priority_score > 30:
+            urgency = "🟢 Medium"
+        else:
+            urgency = "⚪ Low"
+
+        priority_data.append({
+            "Category": category,
+            "Frequency": frequency,
+            "Negative_Feedback": negative_count,
+            "Priority_Score": round(priority_score, 1),
+            "Urgency": urgency,
+            "Sentiment_Score": round(sentiment_score, 1)
+        })
+
+    priority_df = pd.DataFrame(priority_data)
+    priority_df = priority_df.sort_values("Priority_Score", ascending=False)
+
+    return priority_df
+
+
+def same_ranking(engine_df, legacy_df):
+    # The legacy sort is not stable, so categories tied on Priority_Score may come out
+    # in either order: compare the score sequence and each category's row instead.
+    def by_category(df):
+        return df.sort_values("Category").reset_index(drop=True)
+    return (engine_df["Priority_Score"].tolist() == legacy_df["Priority_Score"].tolist()
+            and by_category(engine_df).equals(by_category(legacy_df)))
+
+
+def synthetic_frame(rows, categories, days=90, seed=0):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(datetime.now().date())
+    return pd.DataFrame({
+        "Category": pd.Series([f"Category {i}" for i in rng.integers(0, categories, rows)]),
+        "Sentiment": rng.choice(["Positive", "Neutral", "Negative", "negative"], rows),
+        "Date": end - pd.to_timedelta(rng.integers(0, days, rows), unit="D"),
+    })
+
+
+def timed(func, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_priority(row_counts, category_counts, with_legacy=True):
+    print(f"{'rows':>10} {'categories':>10} {'engine (s)':>12} {'legacy (s)':>12} {'match':>6}")
+    for rows in row_counts:
+        for categories in category_counts:
+            df = synthetic_frame(rows, categories)
+            engine_time, engine_df = timed(calculate_priority_score, df)
+            if with_legacy:
+                legacy_time, legacy_df = timed(legacy_priority_score, df, repeat=1)
+                match = same_ranking(engine_df, legacy_df)
+                legacy_col = f"{legacy_time:12.4f}"
+            else:
+                match = "-"
+                legacy_col = f"{'-':>12}"
+            print(f"{rows:>10} {categories:>10} {engine_time:12.4f} {legacy_col} {str(match):>6}")
+
+
+def synthetic_aggregates(categories, days=90, seed=0):
+    rng = np.random.default_rng(seed)
+    frequency = rng.integers(1, 50, categories)
+    now_seconds = (pd.Timestamp(datetime.now().date()) - core.EPOCH).total_seconds()
+    return pd.DataFrame({
+        "Frequency": frequency,
+        "Negative_Feedback": rng.binomial(frequency, 0.3),
+        "Date_Sum": frequency * (now_seconds - rng.integers(0, days, categories) * 86400.0),
+        "Date_Count": frequency,
+    }, index=pd.Index([f"Category {i}" for i in range(categories)], name="Category"))
+
+
+def bench_top_k(category_counts, k):
+    print(f"{'categories':>10} {'full sort (s)':>14} {f'top {k} (s)':>12} {'match':>6}")
+    for categories in category_counts:
+        agg = synthetic_aggregates(categories)
+        now = datetime.now()
+        full_time, full_df = timed(core.score_categories, agg, now)
+        top_time, top_df = timed(core.score_categories, agg, now, k)
+        match = top_df.equals(full_df.head(k))
+        print(f"{categories:>10} {full_time:14.4f} {top_time:12.4f} {str(match):>6}")
+
+
+def bench_decay(rows, categories, half_life_days):
+    df = synthetic_frame(rows, categories).sample(frac=1, random_state=0).reset_index(drop=True)
+    now = pd.Timestamp(datetime.now().date())
+    seconds = ((df["Date"] - core.EPOCH).dt.total_seconds()).tolist()
+    events = list(zip(df["Category"].tolist(), df["Sentiment"].tolist(), seconds))
+
+    def feed(half_life):
+        scorer = DecayedScores(half_life)
+        for category, sentiment, when in events:
+            scorer.add(category, sentiment, when)
+        return scorer
+
+    # No decay: must reproduce the static formula exactly, per event and in bulk.
+    reference = core.score_categories(core.aggregate_by_category(df), now)
+    add_time, static = timed(feed, None, repeat=1)
+    bulk = DecayedScores(None)
+    bulk.update_frame(df)
+    # Equivalence is covered by tests/test_decayed_scores.py; a run that disagrees stops here.
+    pd.testing.assert_frame_equal(static.scores(now), reference)
+    pd.testing.assert_frame_equal(bulk.scores(now), reference)
+    print(f"{rows} events, {categories} categories")
+
+    # Decayed: incremental counters against weights recomputed from scratch.
+    expected = direct_decayed_aggregates(df, half_life_days, now)
+    decay_time, decayed = timed(feed, half_life_days, repeat=1)
+    bulk = DecayedScores(half_life_days)
+    bulk.update_frame(df)
+    for scorer in [decayed, bulk]:
+        got = scorer.aggregates(now).loc[expected.index]
+        np.testing.assert_allclose(got.to_numpy(), expected[got.columns].to_numpy(), rtol=1e-9)
+
+    print(f"{'add() events/s':>24}: {rows / decay_time:,.0f} (no decay: {rows / add_time:,.0f})")
+    read_time, _ = timed(decayed.scores, now)
+    print(f"{'scores()':>24}: {read_time:.4f} s")
+
+
+def frame_megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def bench_memory(rows, categories):
+    df = synthetic_frame(rows, categories)
+    raw_df = df.astype({"Category": object, "Sentiment": object})
+    encoded = encode_feedback(df)
+    print(f"{rows} rows, {categories} categories")
+    print(f"{'object columns':>20}: {frame_megabytes(raw_df):10.1f} MB")
+    print(f"{'loaded (default)':>20}: {frame_megabytes(df):10.1f} MB")
+    print(f"{'encoded':>20}: {frame_megabytes(encoded):10.1f} MB")
+    for column in encoded.columns:
+        print(f"{column:>20}: {encoded[column].memory_usage(deep=True, index=False) / 1024 ** 2:10.1f} MB")
+    engine_time, _ = timed(calculate_priority_score, df)
+    encoded_time, _ = timed(calculate_priority_score, encoded)
+    print(f"{'score (loaded)':>20}: {engine_time:10.4f} s")
+    print(f"{'score (encoded)':>20}: {encoded_time:10.4f} s")
+
+
+def malform_line(line, kind):
+    if kind == "extra_fields":
+        return line + ",unexpected,extra,fields"
+    if kind == "truncated":
+        return line.split(",", 2)[0] + ",Negative"
+    if kind == "stray_quote":
+        fields = line.split(",", 3)
+        return ",".join(fields[:3] + ['"' + fields[3].lstrip('"')])
+    fields = line.split(",", 3)
+    fields[2] = "not-a-date"
+    return ",".join(fields)
+
+
+def generate_feedback_file(path, rows, categories=50, days=90, malformed_rate=0.0, seed=0, chunk_rows=100_000):
+    # Writes a feedback.csv-shaped file; malformed_rate of the data lines are corrupted
+    # (extra fields, truncated rows, unparseable dates or an unbalanced quote) to exercise
+    # the tolerant reader.
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(datetime.now().date())
+    written = 0
+    malformed = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(FEEDBACK_COLUMNS) + "\n")
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            dates = end - pd.to_timedelta(rng.integers(0, days, n), unit="D")
+            chunk = pd.DataFrame({
+                "Category": pd.Series(rng.integers(0, categories, n)).map("Category {}".format),
+                "Sentiment": rng.choice(core.SENTIMENTS, n),
+                "Date": dates.strftime("%Y-%m-%d"),
+                "Feedback": rng.choice(FEEDBACK_TEXT, n),
+                "User_ID": pd.Series(rng.integers(1000, 10000, n)).map("USER_{}".format),
+                "Platform": rng.choice(["Web", "iOS", "Android"], n),
+                "Priority": rng.choice(["High", "Medium", "Low"], n),
+            })
+            lines = chunk.to_csv(index=False, header=False, lineterminator="\n").splitlines()
+            if malformed_rate:
+                for i in np.flatnonzero(rng.random(n) < malformed_rate):
+                    lines[i] = malform_line(lines[i], MALFORMED_KINDS[rng.integers(len(MALFORMED_KINDS))])
+                    malformed += 1
+            f.write("\n".join(lines) + "\n")
+            written += n
+    return {"rows": rows, "categories": categories, "days": days, "malformed_rate": malformed_rate,
+            "malformed_rows": malformed, "seed": seed}
+
+
+def bench_jsonl(rows, categories):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        frame = synthetic_frame(rows, categories)
+        frame["Date"] = frame["Date"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        frame.to_json(path, orient="records", lines=True)
+        print(f"{rows} records, {os.path.getsize(path) / 1024 ** 2:.1f} MB")
+        decoders = [("json", jsonl_source.json.loads)]
+        if jsonl_source.orjson is not None:
+            decoders.insert(0, ("orjson", jsonl_source.orjson.loads))
+        default = jsonl_source._loads
+        try:
+            for name, loads in decoders:
+                jsonl_source._loads = loads
+                seconds, df = timed(jsonl_source.read_jsonl, path)
+                print(f"{name:>10}: {seconds:8.3f} s  {len(df) / seconds:12,.0f} records/s")
+        finally:
+            jsonl_source._loads = default
+
+
+def bench_parallel(rows, categories, workers):
+    # Partitioned tables must equal the serial ones (tests/test_parallel_scoring.py);
+    # a run that disagrees stops here rather than timing a wrong answer.
+    from feedback_cube import FeedbackCube
+    from parallel_scoring import PartitionedTotals, parallel_file_aggregates
+
+    df = synthetic_frame(rows, categories)
+    encoded = encode_feedback(df)
+    serial_time, serial = timed(core.aggregate_by_category, encoded)
+    crosstab = FeedbackCube(encoded).category_sentiment_counts()
+    print(f"{rows} rows, {categories} categories, {os.cpu_count()} CPUs")
+    print(f"{'frame':>10} {'by':>9} {'workers':>8} {'seconds':>9}")
+    print(f"{'frame':>10} {'serial':>9} {1:>8} {serial_time:9.4f}")
+    for by in ["rows", "category"]:
+        for n in workers:
+            seconds, totals = timed(PartitionedTotals, encoded, n, None, by, repeat=1)
+            pd.testing.assert_frame_equal(totals.category_aggregates(), serial)
+            pd.testing.assert_frame_equal(totals.category_sentiment_counts(), crosstab)
+            print(f"{'frame':>10} {by:>9} {n:>8} {seconds:9.4f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feedback.csv")
+        generate_feedback_file(path, rows, categories)
+        serial_time, serial = timed(core.load_category_aggregates, path, repeat=1)
+        print(f"{'file':>10} {'serial':>9} {1:>8} {serial_time:9.4f}")
+        for n in workers:
+            seconds, merged = timed(parallel_file_aggregates, path, n, repeat=1)
+            pd.testing.assert_frame_equal(merged, serial)
+            print(f"{'file':>10} {'bytes':>9} {n:>8} {seconds:9.4f}")
+
+
+def synthetic_comments(rows, categories, seed=0):
+    # Comments built from a few keywords per category and per sentiment among shared
+    # filler words, with their true labels.
+    rng = np.random.default_rng(seed)
+    filler = np.array([f"word{i}" for i in range(2_000)])
+    topic_words = np.array([[f"topic{c}x{i}" for i in range(8)] for c in range(categories)])
+    tone_words = {"Positive": ["great", "love", "thanks", "fast"], "Neutral": ["okay", "fine", "maybe", "average"],
+                  "Negative": ["broken", "hate", "slow", "crash"]}
+    category = rng.integers(0, categories, rows)
+    sentiment = rng.choice(core.SENTIMENTS, rows)
+    texts = []
+    for c, tone, words in zip(category, sentiment, rng.choice(filler, (rows, 8))):
+        picks = list(words[:5]) + list(rng.choice(topic_words[c], 2)) + [tone_words[tone][rng.integers(4)]]
+        rng.shuffle(picks)
+        texts.append(" ".join(picks).capitalize() + "!")
+    return pd.DataFrame({"Category": [f"cat_{c}" for c in category], "Sentiment": sentiment, "Feedback": texts})
+
+
+def bench_classify(rows, categories, workers):
+    # Held-out accuracy of a model trained on half the comments, then prediction
+    # throughput per worker count and the classified rows fed to calculate_priority_score.
+    from feedback_classifier import FeedbackClassifier, predict_texts
+
+    frame = synthetic_comments(rows, categories)
+    train, test = frame.iloc[: rows // 2], frame.iloc[rows // 2:]
+    seconds, model = timed(lambda: FeedbackClassifier().partial_fit(train["Feedback"], train["Category"],
+                                                                    train["Sentiment"]), repeat=1)
+    print(f"{rows} comments, {categories} categories, {os.cpu_count()} CPUs")
+    print(f"{'train':>10}: {seconds:8.3f} s  {len(train) / seconds:12,.0f} comments/s")
+    texts = test["Feedback"].tolist()
+    for n in workers:
+        seconds, predicted = timed(predict_texts, model, texts, n, repeat=1)
+        category = (predicted["Category"].to_numpy() == test["Category"].to_numpy()).mean()
+        sentiment = (predicted["Sentiment"].to_numpy() == test["Sentiment"].to_numpy()).mean()
+        print(f"{f'{n} worker':>10}: {seconds:8.3f} s  {len(texts) / seconds:12,.0f} comments/s  "
+              f"accuracy: category {category:.3f}, sentiment {sentiment:.3f}")
+
+    labelled = test[["Category", "Sentiment"]].reset_index(drop=True).assign(
+        Category=predicted["Category"], Sentiment=predicted["Sentiment"],
+        Date=pd.Timestamp.now().normalize())
+    seconds, _ = timed(calculate_priority_score, labelled, repeat=1)
+    print(f"{'priority':>10}: {seconds:8.3f} s on the predicted labels")
+
+
+def synthetic_submissions(rows, categories, users, repeat_rate=0.3, seed=0):
+    # synthetic_comments from `users` users over two weeks; repeat_rate of the rows resend
+    # an earlier comment of the same user, half of them with one word changed.
+    rng = np.random.default_rng(seed)
+    frame = synthetic_comments(rows, categories, seed)
+    texts = frame["Feedback"].to_numpy(dtype=object)
+    category = frame["Category"].to_numpy(dtype=object)
+    user = rng.integers(0, users, rows)
+    day = rng.integers(0, 14, rows)
+    for i in np.flatnonzero(rng.random(rows) < repeat_rate):
+        j = rng.integers(0, i + 1)
+        words = texts[j].split()
+        if rng.random() < 0.5:
+            words[rng.integers(len(words))] = "again"
+        texts[i], category[i], user[i], day[i] = " ".join(words), category[j], user[j], max(day[i], day[j])
+    frame["Feedback"], frame["Category"] = texts, category
+    frame["User_ID"] = [f"USER_{u}" for u in user]
+    frame["Date"] = pd.Timestamp("2025-01-06") + pd.to_timedelta(day, unit="D")
+    return frame
+
+
+def bench_dedup(rows, categories, users, threshold):
+    # Insert throughput of the near-duplicate index, how the counts change, and a check
+    # that feeding the same rows in batches gives the same result as one insert.
+    from near_duplicates import NearDuplicateIndex, deduplicated_frequency
+
+    frame = synthetic_submissions(rows, categories, users)
+    print(f"{rows} comments, {users} users, {categories} categories, threshold {threshold}")
+    seconds, (_, repeats) = timed(lambda: NearDuplicateIndex(threshold).insert_frame(frame), repeat=1)
+    print(f"{'insert':>10}: {seconds:8.3f} s  {rows / seconds:12,.0f} comments/s  {repeats.sum()} repeats")
+    batched = NearDuplicateIndex(threshold)
+    start = time.perf_counter()
+    parts = [batched.insert_frame(frame.iloc[i:i + 10_000])[1] for i in range(0, rows, 10_000)]
+    seconds = time.perf_counter() - start
+    same = bool((np.concatenate(parts) == repeats).all())
+    print(f"{'batches':>10}: {seconds:8.3f} s  {rows / seconds:12,.0f} comments/s  same repeats: {same}")
+    print(deduplicated_frequency(frame, NearDuplicateIndex(threshold)).head(5).to_string(index=False))
+
+
+# Optional libraries that only the dashboard's charts and emails should pull in.
+HEAVY_MODULES = ["streamlit", "plotly", "kaleido", "requests", "sklearn", "scipy"]
+COLD_START_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(seconds, *sorted(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def cold_start(module):
+    # One fresh interpreter importing `module`: (seconds, heavy modules it loaded).
+    script = COLD_START_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    seconds, *heavy = result.stdout.split()
+    return float(seconds), heavy
+
+
+def bench_imports(modules, repeat=5):
+    # Cold-start latency: each run is a new interpreter, so nothing is cached in
+    # sys.modules (the OS page cache stays warm, as it would for a scheduled job).
+    for module in modules:
+        try:
+            runs = [cold_start(module) for _ in range(repeat)]
+        except ImportError as e:
+            print(f"{module:>20}: skipped ({e})")
+            continue
+        seconds = sorted(s for s, _ in runs)
+        heavy = ", ".join(runs[0][1]) or "-"
+        print(f"{module:>20}: {seconds[0] * 1000:8.1f} ms best  {seconds[len(seconds) // 2] * 1000:8.1f} ms median"
+              f"  heavy: {heavy}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_pipeline(path, repeat=3, dataset=None):
+    stages = {}
+
+    def record(name, func, *args, rows=None):
+        try:
+            seconds, value = timed(func, *args, repeat=repeat)
+        except Exception as e:
+            stages[name] = {"error": f"{type(e).__name__}: {e}"}
+            return None
+        stages[name] = {"seconds": round(seconds, 6), "repeat": repeat}
+        if rows is not None:
+            stages[name]["rows"] = rows
+        return value
+
+    baseline = record("load.pd_read_csv", lambda: pd.read_csv(path, usecols=core.KEEP_COLS))
+    if baseline is not None:
+        stages["load.pd_read_csv"]["rows"] = len(baseline)
+    quarantine = core.Quarantine()
+    core.read_csv_tolerant(path, core.KEEP_COLS, quarantine=quarantine)
+    raw = record("load.read_csv_tolerant", core.read_csv_tolerant, path, core.KEEP_COLS)
+    stages["load.read_csv_tolerant"].update(rows=len(raw), quarantined=quarantine.total)
+    record("load.clean_feedback", lambda: core.clean_feedback(raw.copy()), rows=len(raw))
+
+    df = record("load_data", lambda: core.load_data(path, use_cache=False))
+    if df is None:
+        return {"meta": pipeline_meta(path, dataset), "stages": stages}
+    rows = len(df)
+    stages["load_data"]["rows"] = rows
+    core.load_data(path)
+    record("load_data.feather_cache", core.load_data, path, rows=rows)
+
+    encoded = record("encode_feedback", encode_feedback, df, rows=rows)
+    priority_df = record("calculate_priority_score", calculate_priority_score, df, rows=rows)
+    record("calculate_priority_score.encoded", calculate_priority_score, encoded, rows=rows)
+    agg = core.aggregate_by_category(df)
+    record("score_categories.top20", core.score_categories, agg, None, 20, rows=len(agg))
+    insights = record("generate_insights", core.generate_insights, priority_df.head(5), rows)
+
+    from feedback_index import FeedbackIndex
+    index = record("feedback_index", FeedbackIndex, df, rows=rows)
+
+    try:
+        import app
+        importlib.import_module("plotly.express")  # app loads it only once a chart is drawn
+    except ImportError as e:
+        stages["dashboard"] = {"skipped": f"dashboard dependencies missing: {e}"}
+    else:
+        cube = index.cube
+        record("create_priority_chart", app.create_priority_chart, priority_df)
+        record("create_sentiment_chart", app.create_sentiment_chart, core.priority_summary(agg)["urgency_counts"])
+        record("create_trend_chart", app.create_trend_chart, cube.weekly_sentiment_counts())
+        record("create_category_sentiment_heatmap", app.create_category_sentiment_heatmap,
+               cube.category_sentiment_counts())
+        record("generate_html_email", app.generate_html_email, priority_df.head(5), insights, "")
+
+    import report_export
+    for fmt in report_export.available_formats():
+        record(f"export.{fmt}", lambda: sum(len(c) for c in report_export.iter_export(agg, fmt)), rows=len(agg))
+    record("export.csv.gz", lambda: sum(len(c) for c in report_export.iter_export(agg, "csv", True)), rows=len(agg))
+
+    return {"meta": pipeline_meta(path, dataset), "stages": stages}
+
+
+def pipeline_meta(path, dataset):
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "file": os.path.basename(path),
+        "file_bytes": os.path.getsize(path),
+        "dataset": dataset,
+    }
+
+
+def add_dataset_args(parser):
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def run_pipeline(args):
+    if args.input:
+        results = bench_pipeline(args.input, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feedback.csv")
+            dataset = generate_feedback_file(path, args.rows, args.categories, args.days,
+                                             args.malformed_rate, args.seed)
+            results = bench_pipeline(path, args.repeat, dataset)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the feedback prioritizer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    priority = commands.add_parser("priority", help="Grouped scoring engine vs the legacy per-category loop")
+    priority.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    priority.add_argument("--categories", type=int, nargs="+", default=[10, 1_000, 10_000])
+    priority.add_argument("--skip-legacy", action="store_true",
+                          help="Only time the grouped engine (the legacy loop is slow at high cardinality)")
+
+    top_k = commands.add_parser("topk", help="Bounded top-K selection vs the full priority sort")
+    top_k.add_argument("--categories", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    top_k.add_argument("-k", type=int, default=20)
+
+    decay = commands.add_parser("decay", help="Time-decayed live scores: update rate (equivalence is asserted)")
+    decay.add_argument("--rows", type=int, default=200_000)
+    decay.add_argument("--categories", type=int, default=1_000)
+    decay.add_argument("--half-life", type=float, default=14.0, help="Half-life in days")
+
+    jsonl = commands.add_parser("jsonl", help="JSON-lines ingestion throughput per decoder")
+    jsonl.add_argument("--rows", type=int, default=1_000_000)
+    jsonl.add_argument("--categories", type=int, default=1_000)
+
+    parallel = commands.add_parser("parallel", help="Partitioned multi-process scoring vs serial")
+    parallel.add_argument("--rows", type=int, default=2_000_000)
+    parallel.add_argument("--categories", type=int, default=1_000)
+    parallel.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+
+    classify = commands.add_parser("classify", help="Offline text categorisation: accuracy and comments/s")
+    classify.add_argument("--rows", type=int, default=400_000)
+    classify.add_argument("--categories", type=int, default=50)
+    classify.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+
+    dedup = commands.add_parser("dedup", help="Near-duplicate index: comments/s and deduplicated frequency")
+    dedup.add_argument("--rows", type=int, default=500_000)
+    dedup.add_argument("--categories", type=int, default=50)
+    dedup.add_argument("--users", type=int, default=50_000)
+    dedup.add_argument("--threshold", type=float, default=0.8)
+
+    imports = commands.add_parser("imports", help="Cold-start import time per module")
+    imports.add_argument("--modules", nargs="+", default=["core", "cli", "parallel_scoring", "report_export", "app"])
+    imports.add_argument("--repeat", type=int, default=5)
+
+    memory = commands.add_parser("memory", help="Loaded vs encoded frame memory")
+    memory.add_argument("--rows", type=int, default=5_000_000)
+    memory.add_argument("--categories", type=int, default=1_000)
+
+    generate = commands.add_parser("generate", help="Write a synthetic feedback CSV")
+    generate.add_argument("path")
+    add_dataset_args(generate)
+
+    pipeline = commands.add_parser("pipeline", help="Time every pipeline stage and emit JSON")
+    pipeline.add_argument("--input", help="Existing feedback CSV (default: generate one from the dataset options)")
+    pipeline.add_argument("--output", help="Write the JSON results here instead of stdout")
+    pipeline.add_argument("--repeat", type=int, default=3)
+    add_dataset_args(pipeline)
+
+    args = parser.parse_args()
+    if args.command == "priority":
+        bench_priority(args.rows, args.categories, with_legacy=not args.skip_legacy)
+    elif args.command == "topk":
+        bench_top_k(args.categories, args.k)
+    elif args.command == "decay":
+        bench_decay(args.rows, args.categories, args.half_life)
+    elif args.command == "jsonl":
+        bench_jsonl(args.rows, args.categories)
+    elif args.command == "parallel":
+        bench_parallel(args.rows, args.categories, args.workers)
+    elif args.command == "classify":
+        bench_classify(args.rows, args.categories, args.workers)
+    elif args.command == "dedup":
+        bench_dedup(args.rows, args.categories, args.users, args.threshold)
+    elif args.command == "imports":
+        bench_imports(args.modules, args.repeat)
+    elif args.command == "memory":
+        bench_memory(args.rows, args.categories)
+    elif args.command == "generate":
+        print(json.dumps(generate_feedback_file(args.path, args.rows, args.categories, args.days,
+                                                args.malformed_rate, args.seed)))
+    else:
+        run_pipeline(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import core
+from decayed_scores import DecayedScores
+from feedback_classifier import FeedbackClassifier, categorized_aggregates, train_classifier
+from jsonl_source import JsonlTail, is_jsonl
+from near_duplicates import THRESHOLD, WINDOW_DAYS, NearDuplicateIndex, deduplicated_aggregates
+from parallel_scoring import default_workers, parallel_file_aggregates
+from report_export import export_filename, parse_export_format, write_export
+
+REPORT_FORMATS = ["csv", "json"]
+LOAD_MODES = ["full", "stream", "incremental", "decayed", "parallel", "classify", "dedup"]
+# Modes --follow can keep up to date; full and stream give the same table as incremental.
+FOLLOW_MODES = ["full", "stream", "incremental", "decayed"]
+
+
+def load_aggregates(path, mode, half_life=None, workers=None, classifier=None, dedup=None):
+    if mode == "dedup":
+        # Near-duplicate submissions counted once; dedup holds NearDuplicateIndex options.
+        agg = deduplicated_aggregates(path, NearDuplicateIndex(**(dedup or {})))
+        return agg, int(agg["Raw_Frequency"].sum())
+    if mode == "classify":
+        # Missing Category/Sentiment labels predicted from the Feedback text by a saved model.
+        agg = categorized_aggregates(path, load_classifier(classifier), workers=workers or default_workers())
+        return agg, int(agg["Frequency"].sum())
+    if mode == "parallel":
+        agg = parallel_file_aggregates(path, workers)
+        return agg, int(agg["Frequency"].sum())
+    if mode == "decayed":
+        scorer = DecayedScores(half_life)
+        for chunk in core.iter_feedback_chunks(path):
+            scorer.update_frame(chunk)
+        return scorer.aggregates(), scorer.events
+    if mode == "stream":
+        agg = core.load_category_aggregates(path)
+        return agg, int(agg["Frequency"].sum())
+    if mode == "incremental":
+        agg = core.update_category_aggregates(path)
+        return agg, int(agg["Frequency"].sum())
+    df = core.load_data(path)
+    return core.aggregate_by_category(df), len(df)
+
+
+@functools.lru_cache(maxsize=4)
+def load_classifier(path):
+    if not path:
+        raise ValueError("--mode classify needs --classifier MODEL (train one with --train-classifier)")
+    return FeedbackClassifier.load(path)
+
+
+def report_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def score_file(path, out_dir, formats, mode, top=None, full_ranking=False, half_life=None, workers=None,
+               classifier=None, dedup=None):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    agg, total_feedback = load_aggregates(path, mode, half_life, workers, classifier, dedup)
+    return write_reports(path, out_dir, formats, agg, total_feedback, top, full_ranking)
+
+
+def write_reports(path, out_dir, formats, agg, total_feedback, top=None, full_ranking=False):
+    priority_df = core.score_categories(agg, top=top)
+    insights = core.generate_insights(priority_df.head(5), total_feedback)
+    name = report_name(path)
+    outputs = []
+
+    if full_ranking:
+        # full_ranking: True (CSV) or an export format such as "parquet" or "jsonl.gz".
+        fmt, compress = parse_export_format("csv" if full_ranking is True else full_ranking)
+        ranking_path = os.path.join(out_dir, export_filename(f"{name}_ranking", fmt, compress))
+        write_export(agg, ranking_path, fmt, compress)
+        outputs.append(ranking_path)
+
+    if "csv" in formats:
+        csv_path = os.path.join(out_dir, f"{name}_priority.csv")
+        priority_df.to_csv(csv_path, index=False)
+        outputs.append(csv_path)
+
+    if "json" in formats:
+        json_path = os.path.join(out_dir, f"{name}_priority.json")
+        report = {
+            "source": path,
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "total_feedback": total_feedback,
+            "priorities": json.loads(priority_df.to_json(orient="records", force_ascii=False)),
+            "insights": insights,
+        }
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        outputs.append(json_path)
+
+    return {"source": path, "rows": total_feedback, "categories": len(agg), "outputs": outputs}
+
+
+def follow_file(path, out_dir, formats, mode, interval, top=None, full_ranking=False, half_life=None,
+                polls=None):
+    # Rewrites the reports every `interval` seconds as records are appended. Decayed mode
+    # feeds each new record into one live DecayedScores; the other modes resume from the
+    # incremental state. Either way only appended bytes are parsed.
+    if mode not in FOLLOW_MODES:
+        raise ValueError(f"--follow supports --mode {', '.join(FOLLOW_MODES)}, not {mode!r}")
+    os.makedirs(out_dir, exist_ok=True)
+    scorer = tail = None
+    if mode == "decayed":
+        scorer = DecayedScores(half_life)
+        tail = JsonlTail(path) if is_jsonl(path) else core.CsvTail(path)
+    else:
+        mode = "incremental"
+    done = 0
+    while polls is None or done < polls:
+        if tail is not None:
+            frame = tail.poll()
+            if len(frame):
+                scorer.update_frame(core.clean_feedback(frame))
+            agg, total_feedback = scorer.aggregates(), scorer.events
+        else:
+            agg, total_feedback = load_aggregates(path, mode, half_life)
+        yield write_reports(path, out_dir, formats, agg, total_feedback, top, full_ranking)
+        done += 1
+        if polls is None or done < polls:
+            time.sleep(interval)
+
+
+def run_batch(paths, out_dir, formats, mode="full", workers=None, top=None, full_ranking=False,
+              half_life=None, classifier=None, dedup=None):
+    os.makedirs(out_dir, exist_ok=True)
+    names = [report_name(p) for p in paths]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Input files share report names: {', '.join(duplicates)}")
+
+    results = []
+    if mode in ("parallel", "classify"):
+        # Each file is already split across the worker pool, so files run one after another.
+        for path in paths:
+            try:
+                results.append(score_file(path, out_dir, formats, mode, top, full_ranking, half_life, workers,
+                                          classifier))
+            except Exception as e:
+                results.append({"source": path, "error": str(e)})
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(score_file, p, out_dir, formats, mode, top, full_ranking, half_life, None, None, dedup): p
+                   for p in paths}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"source": futures[future], "error": str(e)})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score feedback files and write priority reports without Streamlit")
+    parser.add_argument("paths", nargs="+", help="Feedback CSV or JSONL (.jsonl/.ndjson) files to score")
+    parser.add_argument("-o", "--out-dir", default="reports", help="Directory for the generated reports")
+    parser.add_argument("-f", "--format", dest="formats", nargs="+", choices=REPORT_FORMATS, default=REPORT_FORMATS)
+    parser.add_argument("-m", "--mode", choices=LOAD_MODES, default="full",
+                        help="full: load_data; stream: chunked aggregates; incremental: resume from the last run; "
+                             "decayed: time-decayed counts (see --half-life); "
+                             "parallel: split each file across --workers processes; "
+                             "classify: predict missing Category/Sentiment from the Feedback text (see --classifier); "
+                             "dedup: count near-duplicate Feedback from one user once (see --dedup-threshold)")
+    parser.add_argument("--half-life", type=float, default=14.0,
+                        help="Days for a feedback row's weight to halve in decayed mode")
+    parser.add_argument("-k", "--top", type=int, default=None,
+                        help="Keep only the K highest-priority categories in the csv/json reports")
+    parser.add_argument("--full-ranking", action="store_true",
+                        help="Also stream every category's priority row to <name>_ranking.<format>")
+    parser.add_argument("--ranking-format", default="csv", metavar="FORMAT",
+                        help="Format of the --full-ranking file: csv, jsonl or parquet, "
+                             "gzipped with a .gz suffix (e.g. jsonl.gz)")
+    parser.add_argument("--follow", type=float, metavar="SECONDS", default=None,
+                        help="Keep watching a single file for appended records and rewrite its reports")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--classifier", metavar="MODEL", default=None,
+                        help="Saved text model used by --mode classify")
+    parser.add_argument("--train-classifier", metavar="MODEL", default=None,
+                        help="Train a text model on the labelled Feedback rows of the input files, save it to "
+                             "MODEL and exit")
+    parser.add_argument("--dedup-threshold", type=float, default=THRESHOLD,
+                        help="Similarity (0-1) at which dedup mode treats two comments as the same")
+    parser.add_argument("--dedup-window", type=float, default=WINDOW_DAYS,
+                        help="Days per window; dedup mode only collapses comments within one window")
+    parser.add_argument("--dedup-all-users", action="store_true",
+                        help="Collapse near-duplicates across users, not just from the same User_ID")
+    args = parser.parse_args(argv)
+    try:
+        parse_export_format(args.ranking_format)
+    except ValueError as e:
+        parser.error(str(e))
+    full_ranking = args.full_ranking and args.ranking_format
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    if args.train_classifier:
+        model = train_classifier(args.paths)
+        if not model.trained:
+            parser.error("no rows with Feedback text and both Category and Sentiment labels to train on")
+        model.save(args.train_classifier)
+        print(f"{args.train_classifier}: {len(model.category)} categories, "
+              f"{int(model.category.class_counts.sum())} labelled comments")
+        return 0
+    if args.mode == "classify" and not args.classifier:
+        parser.error("--mode classify needs --classifier MODEL")
+    if args.follow is not None:
+        if len(args.paths) != 1:
+            parser.error("--follow takes exactly one input file")
+        if args.mode not in FOLLOW_MODES:
+            parser.error(f"--follow supports --mode {', '.join(FOLLOW_MODES)}, not {args.mode}")
+        try:
+            for result in follow_file(args.paths[0], args.out_dir, args.formats, args.mode, args.follow,
+                                      args.top, full_ranking, args.half_life):
+                print(f"{result['source']}: {result['rows']} rows, {result['categories']} categories")
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    dedup = {"threshold": args.dedup_threshold, "window_days": args.dedup_window,
+             "per_user": not args.dedup_all_users}
+    results = run_batch(args.paths, args.out_dir, args.formats, args.mode, args.workers,
+                        args.top, full_ranking, args.half_life, args.classifier, dedup)
+
+    failed = 0
+    for result in sorted(results, key=lambda r: r["source"]):
+        if "error" in result:
+            failed += 1
+            print(f"FAILED {result['source']}: {result['error']}", file=sys.stderr)
+        else:
+            print(f"{result['source']}: {result['rows']} rows, {result['categories']} categories -> "
+                  f"{', '.join(result['outputs'])}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+import csv
+import io
+import re
+import warnings
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+BLOCK_BYTES = 8 * 1024 * 1024
+NEWLINE, QUOTE, COMMA = ord("\n"), ord('"'), ord(",")
+SKIPPED_LINE = re.compile(r"Skipping line (\d+): (.*)")
+# A quoted field may hold newlines (RFC 4180); one still open after this many physical
+# lines is taken to be a stray quote rather than a long comment.
+MAX_RECORD_LINES = 100
+_BEFORE_OPEN = np.isin(np.arange(256), list(b',"\n'))
+_AFTER_CLOSE = np.isin(np.arange(256), list(b',"\r\n'))
+
+
+class Quarantine:
+    # Malformed lines set aside by the tolerant reader: a running total, counts per
+    # reason and up to max_samples of the offending lines with their line numbers.
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self.total = 0
+        self.reasons = Counter()
+        self.samples = []
+
+    def __len__(self):
+        return self.total
+
+    def add(self, line_number, reason, text):
+        self.total += 1
+        self.reasons[reason] += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append((line_number, reason, text))
+
+    def to_frame(self):
+        return pd.DataFrame(self.samples, columns=["Line", "Reason", "Text"])
+
+    def write(self, path):
+        self.to_frame().to_csv(path, index=False)
+
+
+def _line_bounds(arr):
+    ends = np.flatnonzero(arr == NEWLINE)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+
+def _scan_block(arr, starts, ends):
+    # Quote-aware field count per line. Every search runs the small arrays (line ends,
+    # quote spans) against the large ones, so cost stays close to three byte scans.
+    quotes = np.flatnonzero(arr == QUOTE)
+    commas = np.flatnonzero(arr == COMMA)
+    raw_commas = np.diff(np.searchsorted(commas, ends), prepend=0)
+
+    quote_line = np.searchsorted(ends, quotes)
+    unbalanced = np.bincount(quote_line, minlength=len(ends)) % 2 == 1
+    # Quotes on unbalanced lines are dropped; the rest pair up within their own line and
+    # every comma between a pair is field text, not a delimiter.
+    paired = quotes[~unbalanced[quote_line]]
+    opens, closes = paired[0::2], paired[1::2]
+    quoted_commas = np.searchsorted(commas, closes) - np.searchsorted(commas, opens)
+    inside = np.bincount(quote_line[~unbalanced[quote_line]][0::2], weights=quoted_commas, minlength=len(ends))
+    return raw_commas - inside.astype(np.int64) + 1, unbalanced
+
+
+def _record_fields(arr, quotes, commas, first, last):
+    # Field count of one record spanning bytes first..last whose quotes pair up, and
+    # whether every pair opens after a delimiter and closes before one.
+    spans = quotes[np.searchsorted(quotes, first):np.searchsorted(quotes, last)]
+    opens, closes = spans[0::2], spans[1::2]
+    quoted_commas = int((np.searchsorted(commas, closes) - np.searchsorted(commas, opens)).sum())
+    delimited = bool(_BEFORE_OPEN[arr[np.maximum(opens - 1, first)]].all() and _AFTER_CLOSE[arr[closes + 1]].all())
+    return int(np.searchsorted(commas, last) - np.searchsorted(commas, first)) - quoted_commas + 1, delimited
+
+
+def _decode(raw):
+    return raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+def _fold_extra(raw, width):
+    # An unquoted comma in a free-text field leaves a row longer than the header; as
+    # pd.read_csv(usecols=...) did, keep it and fold the surplus into the last column.
+    text = raw.decode("utf-8", errors="surrogateescape").rstrip("\r\n")
+    fields = next(csv.reader([text]))
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(fields[:width - 1] + [",".join(fields[width - 1:])])
+    return out.getvalue().encode("utf-8", errors="surrogateescape")
+
+
+class _PieceStream(io.RawIOBase):
+    # File-like view over a generator of byte strings, consumed lazily by the C parser.
+    def __init__(self, pieces):
+        self._pieces = pieces
+        self._current = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not len(self._current):
+            try:
+                self._current = memoryview(next(self._pieces))
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+
+def _clean_pieces(f, width, needed, block_size, quarantine, kept_lines, max_record_lines=MAX_RECORD_LINES):
+    # Yields the file's data records block by block with malformed ones cut out, after a
+    # blank full-width first row that fixes the column count (short rows that still reach
+    # the wanted columns are then padded instead of rejected). kept_lines collects the
+    # file line number each record passed on starts at, to map parser complaints back.
+    yield b"," * (width - 1) + b"\n"
+    line_number = 2
+    pending = b""
+    while True:
+        data = f.read(block_size)
+        at_eof = not data
+        buf = pending + data
+        if at_eof and buf and not buf.endswith(b"\n"):
+            buf += b"\n"
+        arr = np.frombuffer(buf, dtype=np.uint8)
+        starts, ends = _line_bounds(arr)
+        complete = arr[:ends[-1] + 1] if len(ends) else arr[:0]
+        fields, unbalanced = _scan_block(complete, starts, ends)
+
+        # A line with an odd number of quotes opens a quoted field that the next such
+        # line closes (RFC 4180 allows newlines inside quotes). The pair is one record
+        # if it closes within max_record_lines and comes out well-quoted and the right
+        # width; otherwise the opening line has a stray quote and the closing line is
+        # tried as an opener. A record still open at the end of the block is carried
+        # into the next one.
+        quotes = np.flatnonzero(complete == QUOTE)
+        commas = np.flatnonzero(complete == COMMA)
+        in_record = np.zeros(len(ends), dtype=bool)
+        record_start = np.zeros(len(ends), dtype=bool)
+        stray = np.zeros(len(ends), dtype=bool)
+        carry = len(ends)
+        odd = np.flatnonzero(unbalanced)
+        i = 0
+        while i < len(odd):
+            first = odd[i]
+            if i + 1 < len(odd):
+                last = odd[i + 1]
+                if last - first < max_record_lines:
+                    n_fields, delimited = _record_fields(arr, quotes, commas, starts[first], ends[last])
+                    if delimited and needed <= n_fields <= width:
+                        in_record[first:last + 1] = True
+                        record_start[first] = True
+                        i += 2
+                        continue
+            elif not at_eof and len(ends) - first <= max_record_lines:
+                carry = first
+                break
+            stray[first] = True
+            i += 1
+
+        lengths = ends[:carry] - starts[:carry]
+        fields, in_record, record_start, stray = fields[:carry], in_record[:carry], record_start[:carry], stray[:carry]
+        single = ~in_record & ~stray
+        blank = single & ((lengths == 0) | ((lengths == 1) & (arr[starts[:carry]] == ord("\r"))))
+        bad = single & ~blank & (fields < needed)
+        long = single & ~blank & (fields > width)
+        for i in np.flatnonzero(bad | stray):
+            reason = "unbalanced quote" if stray[i] else f"expected {width} fields, saw {fields[i]}"
+            quarantine.add(line_number + int(i), reason, _decode(buf[starts[i]:ends[i] + 1]))
+
+        keep = in_record | (single & ~blank & ~bad)
+        kept_lines.append(line_number + np.flatnonzero(record_start | (keep & ~in_record)))
+        done = starts[carry] if carry < len(ends) else (ends[-1] + 1 if len(ends) else 0)
+        pending = buf[done:]
+        if keep.all() and carry and not long.any():
+            yield buf[:done]
+        elif keep.any():
+            edges = np.append(starts[:carry], done)
+            copy = keep & ~long
+            begin = 0
+            for i in [*np.flatnonzero(long), carry]:
+                if copy[begin:i].any():
+                    yield arr[edges[begin]:edges[i]][np.repeat(copy[begin:i], lengths[begin:i] + 1)].tobytes()
+                if i < carry:
+                    yield _fold_extra(buf[starts[i]:ends[i] + 1], width)
+                begin = i + 1
+        line_number += int(carry)
+        if at_eof:
+            return
+
+
+def iter_tolerant_chunks(source, columns, dtype=None, parse_dates=None, chunksize=None,
+                         block_size=BLOCK_BYTES, quarantine=None):
+    # Single pass over record-aligned byte blocks. Lines with a stray quote or records with
+    # too few fields to reach the wanted columns are quarantined;
+    # the remaining bytes stream into one C-parser read, so clean files parse at close
+    # to pd.read_csv speed. Quoted fields may span physical lines, as in pd.read_csv.
+    if quarantine is None:
+        quarantine = Quarantine(max_samples=0)
+    f = open(source, "rb") if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__") else source
+    try:
+        header = f.readline()
+        header_cols = [h.strip() for h in next(csv.reader([_decode(header)]), [])]
+        if all(c in header_cols for c in columns):
+            positions = [header_cols.index(c) for c in columns]
+        else:
+            positions = list(range(len(columns)))
+        width = max(len(header_cols), max(positions) + 1)
+        names = dict(zip(positions, columns))
+        kept_lines = []
+        stream = io.BufferedReader(
+            _PieceStream(_clean_pieces(f, width, max(positions) + 1, block_size, quarantine, kept_lines)),
+            buffer_size=1024 * 1024,
+        )
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", pd.errors.ParserWarning)
+            reader = pd.read_csv(
+                stream,
+                header=None,
+                names=list(range(width)),
+                usecols=positions,
+                dtype={p: dtype[c] for p, c in names.items() if dtype and c in dtype},
+                parse_dates=[p for p, c in names.items() if parse_dates and c in parse_dates] or None,
+                encoding_errors="replace",
+                on_bad_lines="warn",
+                chunksize=chunksize,
+            )
+            frames = [reader] if chunksize is None else reader
+            for n, frame in enumerate(frames):
+                if n == 0:
+                    frame = frame.iloc[1:].reset_index(drop=True)
+                if len(frame):
+                    yield frame.rename(columns=names)[columns]
+
+        for warning in caught:
+            skipped = list(SKIPPED_LINE.finditer(str(warning.message)))
+            if not skipped:
+                warnings.warn(warning.message, warning.category)
+            if skipped:
+                kept = np.concatenate(kept_lines)
+                for match in skipped:
+                    quarantine.add(int(kept[int(match.group(1)) - 2]), match.group(2).strip(), None)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_csv_tolerant(source, columns, quarantine=None, **kwargs):
+    frames = list(iter_tolerant_chunks(source, columns, quarantine=quarantine, **kwargs))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
@@ -0,0 +1,210 @@
+import glob
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+DEFAULT_SOURCES = "feedback.csv"
+DEFAULT_UPLOAD_DIR = "uploads"
+DEFAULT_CACHE_MB = 1024
+DEFAULT_CACHE_TTL = 3600
+FEEDBACK_EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+
+Dataset = namedtuple("Dataset", ["name", "path", "uploaded"])
+
+
+def dataset_key(path):
+    # Identifies one version of a source file: a rewrite changes size or mtime, so its
+    # cache entries are simply never asked for again and age out.
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (os.path.abspath(path), None, None)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def estimate_bytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values())
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(value)
+
+
+def _feedback_files(directory):
+    return sorted(p for p in glob.glob(os.path.join(directory, "*")) if p.lower().endswith(FEEDBACK_EXTENSIONS))
+
+
+class DatasetRegistry:
+    # Feedback sources the dashboard can switch between. sources lists CSV/JSONL files,
+    # glob patterns or directories (every feedback file inside); uploads are stored in
+    # upload_dir under their content hash, so sessions uploading the same file get the same
+    # dataset and therefore the same cached parse.
+    def __init__(self, sources=(DEFAULT_SOURCES,), upload_dir=DEFAULT_UPLOAD_DIR):
+        self.sources = list(sources)
+        self.upload_dir = upload_dir
+
+    @classmethod
+    def from_env(cls):
+        # FEEDBACK_SOURCES: os.pathsep-separated files, globs or directories.
+        sources = os.environ.get("FEEDBACK_SOURCES", DEFAULT_SOURCES).split(os.pathsep)
+        return cls([s for s in sources if s], os.environ.get("FEEDBACK_UPLOAD_DIR", DEFAULT_UPLOAD_DIR))
+
+    def _source_paths(self):
+        for source in self.sources:
+            if os.path.isdir(source):
+                yield from _feedback_files(source)
+            elif glob.has_magic(source):
+                yield from sorted(glob.glob(source))
+            else:
+                yield source
+
+    def datasets(self):
+        # Rescanned on every call so files dropped into a source directory, or uploaded
+        # by another session, show up without a restart.
+        found = OrderedDict()
+        for path in self._source_paths():
+            name = os.path.splitext(os.path.basename(path))[0]
+            if name in found:
+                name = os.path.relpath(path)
+            found.setdefault(name, Dataset(name, path, False))
+        if os.path.isdir(self.upload_dir):
+            for path in _feedback_files(self.upload_dir):
+                name = "⬆ " + os.path.splitext(os.path.basename(path))[0]
+                found.setdefault(name, Dataset(name, path, True))
+        return found
+
+    def names(self):
+        return list(self.datasets())
+
+    def get(self, name):
+        return self.datasets().get(name)
+
+    def add_upload(self, filename, data):
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        stem = re.sub(r"[^\w.-]+", "_", stem).strip("._") or "upload"
+        if extension.lower() not in FEEDBACK_EXTENSIONS:
+            extension = ".csv"
+        path = os.path.join(self.upload_dir, f"{stem}-{digest}{extension.lower()}")
+        if not os.path.exists(path):
+            os.makedirs(self.upload_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return "⬆ " + os.path.splitext(os.path.basename(path))[0]
+
+
+class _Entry:
+    __slots__ = ("value", "nbytes", "expires")
+
+    def __init__(self, value, nbytes, expires):
+        self.value = value
+        self.nbytes = nbytes
+        self.expires = expires
+
+
+class SharedDatasetCache:
+    # Process-wide cache for parsed datasets and the tables computed from them, shared by
+    # every session. Entries are sized with estimate_bytes (or an explicit nbytes) and
+    # evicted least-recently-used first once max_bytes is exceeded; each also expires
+    # ttl seconds after it was built. Concurrent get_or_build calls for the same key
+    # wait for a single build instead of each parsing their own copy.
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 ** 2, ttl=DEFAULT_CACHE_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        # FEEDBACK_CACHE_MB sets the memory budget, FEEDBACK_CACHE_TTL the lifetime in seconds.
+        max_mb = float(os.environ.get("FEEDBACK_CACHE_MB", DEFAULT_CACHE_MB))
+        ttl = float(os.environ.get("FEEDBACK_CACHE_TTL", DEFAULT_CACHE_TTL))
+        return cls(int(max_mb * 1024 ** 2), ttl or None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+
+    def _expire(self, now):
+        for key in [k for k, e in self._entries.items() if e.expires is not None and e.expires <= now]:
+            self._drop(key)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires is not None and entry.expires <= self.clock():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_bytes(value) if nbytes is None else nbytes
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                # Larger than the whole budget: hand it back uncached rather than flushing
+                # everything else for it.
+                return value
+            now = self.clock()
+            self._expire(now)
+            self._entries[key] = _Entry(value, nbytes, None if self.ttl is None else now + self.ttl)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+        return value
+
+    def get_or_build(self, key, build, nbytes=None):
+        # nbytes(value) -> int overrides estimate_bytes for values it cannot size.
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is None:
+                try:
+                    value = build()
+                    self.put(key, value, None if nbytes is None else nbytes(value))
+                finally:
+                    with self._lock:
+                        self._building.pop(key, None)
+        return value
+
+    def stats(self):
+        with self._lock:
+            self._expire(self.clock())
+            return {"entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
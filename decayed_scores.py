@@ -0,0 +1,160 @@
+import math
+import numbers
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core import EPOCH, NEGATIVE_CODE, SECONDS_PER_DAY, is_encoded, score_categories
+
+AGGREGATE_COLUMNS = ["Frequency", "Negative_Feedback", "Date_Sum", "Date_Count"]
+
+
+def to_seconds(when):
+    if isinstance(when, numbers.Real):
+        return float(when)
+    return (pd.Timestamp(when) - EPOCH).total_seconds()
+
+
+class DecayedScores:
+    # Exponentially decayed per-category counters for live scoring. Every event's weight
+    # halves each half_life_days, so Frequency, Negative_Feedback and the mean date (the
+    # inputs to core.score_categories) follow recent activity. Each category keeps its
+    # counters as of its latest event; add() decays them forward and adds the new event,
+    # so an update is O(1) and reading scores costs O(categories), never a rescan.
+    #
+    # With half_life_days=None nothing decays: the counters are exactly the sums
+    # aggregate_by_category computes, and scores(now) equals
+    # score_categories(aggregate_by_category(df), now) on the same rows
+    # (see tests/test_decayed_scores.py).
+    def __init__(self, half_life_days=14.0):
+        self.half_life_days = half_life_days
+        self.rate = 0.0 if half_life_days is None else math.log(2) / (half_life_days * SECONDS_PER_DAY)
+        self.slots = {}
+        self.categories = []
+        self.frequency = []
+        self.negative = []
+        self.date_sum = []
+        self.updated = []
+        self.events = 0
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _slot(self, category, seconds):
+        slot = self.slots.get(category)
+        if slot is None:
+            slot = self.slots[category] = len(self.categories)
+            self.categories.append(category)
+            self.frequency.append(0.0)
+            self.negative.append(0.0)
+            self.date_sum.append(0.0)
+            self.updated.append(seconds)
+        return slot
+
+    def _advance(self, slot, seconds):
+        # Returns the weight of an event at `seconds` relative to the slot's counters.
+        # Newer events move the counters forward; late (out-of-order) events are
+        # discounted back to the counters' time instead.
+        last = self.updated[slot]
+        if seconds <= last:
+            return math.exp(-self.rate * (last - seconds)) if self.rate else 1.0
+        if self.rate:
+            factor = math.exp(-self.rate * (seconds - last))
+            self.frequency[slot] *= factor
+            self.negative[slot] *= factor
+            self.date_sum[slot] *= factor
+        self.updated[slot] = seconds
+        return 1.0
+
+    def add(self, category, sentiment, when):
+        seconds = to_seconds(when)
+        slot = self._slot(category, seconds)
+        weight = self._advance(slot, seconds)
+        self.frequency[slot] += weight
+        if str(sentiment).lower() == "negative":
+            self.negative[slot] += weight
+        self.date_sum[slot] += weight * seconds
+        self.events += 1
+
+    def update_frame(self, df):
+        # Bulk form of add() for cleaned or encoded feedback rows; same result as adding
+        # them one by one, in O(rows + categories in the batch).
+        if is_encoded(df):
+            codes = df["Category"].cat.codes.to_numpy()
+            uniques = df["Category"].cat.categories
+            negative = df["Sentiment"].cat.codes.to_numpy() == NEGATIVE_CODE
+            seconds = df["Day"].to_numpy() * float(SECONDS_PER_DAY)
+        else:
+            codes, uniques = pd.factorize(df["Category"], sort=False)
+            negative = (df["Sentiment"].str.lower() == "negative").to_numpy()
+            seconds = (pd.to_datetime(df["Date"]) - EPOCH).dt.total_seconds().to_numpy()
+        keep = codes >= 0
+        codes, negative, seconds = codes[keep], negative[keep], seconds[keep]
+        if not len(codes):
+            return
+
+        latest = np.full(len(uniques), -np.inf)
+        np.maximum.at(latest, codes, seconds)
+        present = np.flatnonzero(latest > -np.inf)
+        slots = np.array([self._slot(uniques[i], latest[i]) for i in present])
+        last = np.full(len(uniques), -np.inf)
+        last[present] = np.array(self.updated)[slots]
+        reference = np.maximum(last, latest)
+
+        weights = np.exp(-self.rate * (reference[codes] - seconds)) if self.rate else np.ones(len(codes))
+        frequency = np.bincount(codes, weights=weights, minlength=len(uniques))
+        negatives = np.bincount(codes, weights=weights * negative, minlength=len(uniques))
+        date_sum = np.bincount(codes, weights=weights * seconds, minlength=len(uniques))
+        carry = np.exp(-self.rate * (reference - last)) if self.rate else np.ones(len(uniques))
+
+        for i, slot in zip(present.tolist(), slots.tolist()):
+            self.frequency[slot] = self.frequency[slot] * carry[i] + frequency[i]
+            self.negative[slot] = self.negative[slot] * carry[i] + negatives[i]
+            self.date_sum[slot] = self.date_sum[slot] * carry[i] + date_sum[i]
+            self.updated[slot] = reference[i]
+        self.events += len(codes)
+
+    def aggregates(self, now=None):
+        # Counters decayed to `now`, in the shape core.score_categories expects.
+        if now is None:
+            now = datetime.now()
+        index = pd.Index(self.categories, name="Category")
+        if not self.rate:
+            frequency = np.array(self.frequency, dtype=np.int64)
+            return pd.DataFrame({
+                "Frequency": frequency,
+                "Negative_Feedback": np.array(self.negative, dtype=np.int64),
+                "Date_Sum": np.array(self.date_sum, dtype=float),
+                "Date_Count": frequency,
+            }, index=index, columns=AGGREGATE_COLUMNS)
+        factor = np.exp(-self.rate * (to_seconds(now) - np.array(self.updated, dtype=float)))
+        frequency = np.array(self.frequency, dtype=float) * factor
+        return pd.DataFrame({
+            "Frequency": frequency,
+            "Negative_Feedback": np.array(self.negative, dtype=float) * factor,
+            "Date_Sum": np.array(self.date_sum, dtype=float) * factor,
+            "Date_Count": frequency,
+        }, index=index, columns=AGGREGATE_COLUMNS)
+
+    def scores(self, now=None, top=None):
+        if now is None:
+            now = datetime.now()
+        return score_categories(self.aggregates(now), now, top)
+
+
+def direct_decayed_aggregates(df, half_life_days, now):
+    # What DecayedScores(half_life_days).aggregates(now) maintains incrementally,
+    # recomputed from scratch by weighting every row 0.5 ** (age / half-life); the
+    # reference for the tests and the decay benchmark.
+    seconds = (pd.to_datetime(df["Date"]) - EPOCH).dt.total_seconds().to_numpy()
+    weights = 0.5 ** ((to_seconds(now) - seconds) / (half_life_days * SECONDS_PER_DAY))
+    frame = pd.DataFrame({
+        "Category": df["Category"].to_numpy(),
+        "Frequency": weights,
+        "Negative_Feedback": weights * (df["Sentiment"].str.lower() == "negative").to_numpy(),
+        "Date_Sum": weights * seconds,
+    })
+    agg = frame.groupby("Category", sort=False).sum()
+    agg["Date_Count"] = agg["Frequency"]
+    return agg
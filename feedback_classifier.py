@@ -0,0 +1,358 @@
+import csv
+import string
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import core
+from csv_recovery import iter_tolerant_chunks
+from jsonl_source import TEXT_COLUMNS, is_jsonl, iter_jsonl_chunks
+
+N_FEATURES = 2 ** 17
+ALPHA = 0.1
+BATCH_SIZE = 50_000
+# Comments scored per block inside predict(); bounds the (n-grams x classes) table gathered.
+PREDICT_BLOCK = 8192
+UNCATEGORIZED = "Uncategorized"
+PREDICTION_COLUMNS = ["Category", "Category_Confidence", "Sentiment", "Sentiment_Confidence"]
+# Marks where one comment ends in the joined token stream (and is blanked out of the
+# comments themselves); punctuation and whitespace become word breaks.
+_SEPARATOR = "\x01"
+_WORD_BREAKS = str.maketrans({c: " " for c in string.punctuation + string.whitespace})
+_BIGRAM_MIX = np.uint64(0x9E3779B1)
+
+
+def hash_tokens(texts):
+    # 32-bit hashes of each comment's word unigrams and bigrams. Returns (hashes, counts):
+    # the hashes of every comment laid out one comment after another, and how many belong
+    # to each. Tokenising is one split() over all comments joined together and every
+    # distinct token is hashed once, so the cost per comment is a few dozen vectorised
+    # operations.
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    joined = f" {_SEPARATOR} ".join(t.replace(_SEPARATOR, " ") for t in texts)
+    tokens = joined.translate(_WORD_BREAKS).lower().split()
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64), np.zeros(len(texts), dtype=np.int64)
+    codes, uniques = pd.factorize(np.array(tokens, dtype=object))
+    hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in uniques), dtype=np.uint64, count=len(uniques))
+
+    separator = uniques == _SEPARATOR
+    marks = separator[codes]
+    doc = np.cumsum(marks)[~marks]
+    unigrams = hashes[codes[~marks]]
+    same = doc[1:] == doc[:-1]
+    bigrams = ((unigrams[:-1] * _BIGRAM_MIX + unigrams[1:] + np.uint64(1)) & np.uint64(0xFFFFFFFF))[same]
+
+    docs = np.concatenate([doc, doc[1:][same]])
+    # Both halves are already in comment order, so the stable sort only merges two runs.
+    order = np.argsort(docs, kind="stable")
+    return np.concatenate([unigrams, bigrams])[order], np.bincount(docs, minlength=len(texts))
+
+
+def hash_features(texts, n_features=N_FEATURES):
+    # hash_tokens folded into n_features buckets, as feature ids.
+    hashes, counts = hash_tokens(texts)
+    return (hashes % np.uint64(n_features)).astype(np.int64), counts
+
+
+def _segment_sums(values, counts):
+    # values: (classes, n) with the n entries grouped by comment, counts per comment.
+    # Returns (comments, classes) sums; reducing along contiguous rows keeps this fast.
+    totals = np.zeros((len(counts), values.shape[0]), dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        totals[nonempty] = np.add.reduceat(values, starts, axis=1).T
+    return totals
+
+
+class NaiveBayesHead:
+    # Multinomial naive Bayes over hashed n-gram counts. Raw counts are kept rather than
+    # probabilities, so training can go through a file in batches and resume from a
+    # saved model; the log-probability table is rebuilt on the first prediction after.
+    def __init__(self, n_features=N_FEATURES, alpha=ALPHA):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.classes = []
+        self.class_counts = np.zeros(0, dtype=np.int64)
+        # (n_features, capacity) counts; capacity doubles as classes appear, so a batch
+        # adds its counts in place instead of reallocating the whole table.
+        self._counts = np.zeros((n_features, 0))
+        self._tables = None
+
+    def __len__(self):
+        return len(self.classes)
+
+    @property
+    def feature_counts(self):
+        return self._counts[:, :len(self.classes)]
+
+    @feature_counts.setter
+    def feature_counts(self, counts):
+        self._counts = np.ascontiguousarray(counts, dtype=np.float64)
+
+    def partial_fit(self, features, counts, labels):
+        labels = pd.Series(labels, dtype=object).reset_index(drop=True)
+        labelled = labels.notna().to_numpy()
+        if not labelled.any():
+            return
+        for label in pd.unique(labels[labelled]):
+            if label not in self.classes:
+                self.classes.append(label)
+        n_classes = len(self.classes)
+        capacity = self._counts.shape[1]
+        if n_classes > capacity:
+            grown = np.zeros((self.n_features, max(n_classes, 2 * capacity)))
+            grown[:, :capacity] = self._counts
+            self._counts = grown
+            capacity = grown.shape[1]
+        label_codes = np.full(len(labels), -1, dtype=np.int64)
+        label_codes[labelled] = pd.Index(self.classes).get_indexer(labels[labelled])
+
+        token_codes = np.repeat(label_codes, counts)
+        keep = token_codes >= 0
+        cells, cell_counts = np.unique(features[keep] * capacity + token_codes[keep], return_counts=True)
+        self._counts.reshape(-1)[cells] += cell_counts
+        class_counts = np.zeros(n_classes, dtype=np.int64)
+        class_counts[:len(self.class_counts)] = self.class_counts
+        self.class_counts = class_counts + np.bincount(label_codes[labelled], minlength=n_classes)
+        self._tables = None
+
+    def _log_tables(self):
+        if self._tables is None:
+            smoothed = self.feature_counts + self.alpha
+            # Stored one row per class, so each class's n-gram weights are contiguous.
+            log_prob = np.ascontiguousarray((np.log(smoothed) - np.log(smoothed.sum(axis=0))).T, dtype=np.float32)
+            log_prior = np.log(self.class_counts / self.class_counts.sum())
+            self._tables = (log_prob, log_prior)
+        return self._tables
+
+    def predict(self, features, counts):
+        # (labels, confidence): the most likely class per comment and its posterior.
+        log_prob, log_prior = self._log_tables()
+        joint = _segment_sums(np.take(log_prob, features, axis=1), counts) + log_prior
+        best = joint.argmax(axis=1)
+        confidence = 1.0 / np.exp(joint - joint.max(axis=1, keepdims=True)).sum(axis=1)
+        return np.asarray(self.classes, dtype=object)[best], confidence
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_counts"] = self.feature_counts.copy()
+        state["_tables"] = None
+        return state
+
+
+class FeedbackClassifier:
+    # Offline Category and Sentiment model for raw Feedback text: hashed word n-grams
+    # into one naive Bayes head per label, trained from already-labelled feedback.
+    # Needs only numpy and runs without any network access.
+    def __init__(self, n_features=N_FEATURES, alpha=ALPHA):
+        self.n_features = n_features
+        self.category = NaiveBayesHead(n_features, alpha)
+        self.sentiment = NaiveBayesHead(n_features, alpha)
+
+    @property
+    def trained(self):
+        return len(self.category) > 0 and len(self.sentiment) > 0
+
+    def partial_fit(self, texts, categories=None, sentiments=None):
+        features, counts = hash_features(texts, self.n_features)
+        has_text = counts > 0
+        if categories is not None:
+            categories = pd.Series(categories, dtype=object).reset_index(drop=True).str.strip()
+            self.category.partial_fit(features, counts, categories.where(has_text & (categories != "")))
+        if sentiments is not None:
+            # Only the known sentiments, spelled as core.SENTIMENTS spells them.
+            sentiments = pd.Series(sentiments, dtype=object).reset_index(drop=True).str.strip().str.lower()
+            canonical = sentiments.map({s.lower(): s for s in core.SENTIMENTS})
+            self.sentiment.partial_fit(features, counts, canonical.where(has_text))
+        return self
+
+    def predict(self, texts, batch_size=PREDICT_BLOCK):
+        if not self.trained:
+            raise ValueError("FeedbackClassifier has not been trained on any labelled feedback")
+        texts = list(texts)
+        frames = []
+        for start in range(0, len(texts), batch_size):
+            features, counts = hash_features(texts[start:start + batch_size], self.n_features)
+            category, category_confidence = self.category.predict(features, counts)
+            sentiment, sentiment_confidence = self.sentiment.predict(features, counts)
+            frames.append(pd.DataFrame({
+                "Category": category,
+                "Category_Confidence": category_confidence,
+                "Sentiment": sentiment,
+                "Sentiment_Confidence": sentiment_confidence,
+            }, columns=PREDICTION_COLUMNS))
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype=object if c in ("Category", "Sentiment") else float)
+                                 for c in PREDICTION_COLUMNS})
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def save(self, path):
+        # Plain arrays only, so loading never unpickles anything.
+        heads = {"category": self.category, "sentiment": self.sentiment}
+        arrays = {"n_features": np.array(self.n_features), "alpha": np.array(self.category.alpha)}
+        for name, head in heads.items():
+            arrays[f"{name}_classes"] = np.array(head.classes, dtype=str)
+            arrays[f"{name}_class_counts"] = head.class_counts
+            arrays[f"{name}_feature_counts"] = head.feature_counts.astype(np.float32)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(int(data["n_features"]), float(data["alpha"]))
+            for name in ("category", "sentiment"):
+                head = getattr(model, name)
+                head.classes = data[f"{name}_classes"].tolist()
+                head.class_counts = data[f"{name}_class_counts"].astype(np.int64)
+                head.feature_counts = data[f"{name}_feature_counts"].astype(np.float64)
+        return model
+
+
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _predict_batch(texts):
+    return _worker_model.predict(texts)
+
+
+class BatchPredictor:
+    # model.predict over large batches of comments, spread across a process pool when
+    # workers > 1. The pool and its copy of the model live as long as the predictor, so
+    # a file classified chunk by chunk starts the workers only once.
+    def __init__(self, model, workers=1, batch_size=BATCH_SIZE):
+        self.model = model
+        self.workers = workers or 1
+        self.batch_size = batch_size
+        self._pool = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.model,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def predict(self, texts):
+        texts = list(texts)
+        if self._pool is None or len(texts) <= self.batch_size // 4:
+            return self.model.predict(texts)
+        # Small inputs are still split so every worker gets a share.
+        size = min(self.batch_size, -(-len(texts) // self.workers))
+        batches = [texts[start:start + size] for start in range(0, len(texts), size)]
+        return pd.concat(self._pool.map(_predict_batch, batches), ignore_index=True)
+
+
+def predict_texts(model, texts, workers=1, batch_size=BATCH_SIZE):
+    with BatchPredictor(model, workers, batch_size) as predictor:
+        return predictor.predict(texts)
+
+
+def iter_text_chunks(path, chunksize=core.STREAM_CHUNKSIZE, quarantine=None, columns=TEXT_COLUMNS):
+    # Category, Sentiment, Date and Feedback chunks (plus any further `columns`) from a
+    # CSV or JSONL file; columns the file does not have come back empty. The Feedback
+    # column itself is required.
+    if is_jsonl(path):
+        yield from iter_jsonl_chunks(path, chunksize, quarantine=quarantine, columns=columns)
+        return
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        header = [h.strip() for h in next(csv.reader([f.readline()]), [])]
+    present = [c for c in columns if c in header]
+    if "Feedback" not in present:
+        raise ValueError(f"{path} has no Feedback column to classify")
+    chunks = iter_tolerant_chunks(
+        path,
+        present,
+        dtype={c: "str" for c in present if c not in core.KEEP_COLS},
+        parse_dates=["Date"] if "Date" in present else None,
+        chunksize=chunksize,
+        quarantine=quarantine,
+    )
+    for chunk in chunks:
+        yield chunk.reindex(columns=columns)
+
+
+def _needs_labels(frame, overwrite):
+    if overwrite:
+        return frame["Feedback"].notna().to_numpy()
+    category = frame["Category"].astype(object)
+    sentiment = frame["Sentiment"].astype(object)
+    missing = category.isna() | (category.astype(str).str.strip() == "") | sentiment.isna()
+    return (missing & frame["Feedback"].notna()).to_numpy()
+
+
+def apply_predictions(frame, predictions, rows, overwrite=False, min_confidence=0.0):
+    # Writes predictions for the given rows into Category/Sentiment: only where a label is
+    # missing unless overwrite. Categories predicted with less than min_confidence become
+    # UNCATEGORIZED instead of a guess.
+    frame = frame.copy()
+    frame["Category"] = frame["Category"].astype(object)
+    frame["Sentiment"] = frame["Sentiment"].astype(object)
+    category = predictions["Category"].to_numpy(dtype=object).copy()
+    category[predictions["Category_Confidence"].to_numpy() < min_confidence] = UNCATEGORIZED
+    target = frame.index[rows]
+    if overwrite:
+        frame.loc[target, "Category"] = category
+        frame.loc[target, "Sentiment"] = predictions["Sentiment"].to_numpy(dtype=object)
+    else:
+        current = frame.loc[target, ["Category", "Sentiment"]]
+        no_category = current["Category"].isna() | (current["Category"].astype(str).str.strip() == "")
+        frame.loc[target[no_category.to_numpy()], "Category"] = category[no_category.to_numpy()]
+        no_sentiment = current["Sentiment"].isna().to_numpy()
+        frame.loc[target[no_sentiment], "Sentiment"] = predictions["Sentiment"].to_numpy(dtype=object)[no_sentiment]
+    return frame
+
+
+def iter_categorized_chunks(path, model, chunksize=core.STREAM_CHUNKSIZE, workers=1, batch_size=BATCH_SIZE,
+                            overwrite=False, min_confidence=0.0, quarantine=None):
+    # Cleaned Category/Sentiment/Date chunks (as core.iter_feedback_chunks yields) with
+    # missing labels predicted from the Feedback text; only those rows are classified.
+    with BatchPredictor(model, workers, batch_size) as predictor:
+        for chunk in iter_text_chunks(path, chunksize, quarantine):
+            rows = _needs_labels(chunk, overwrite)
+            if rows.any():
+                predictions = predictor.predict(chunk["Feedback"].to_numpy(dtype=object)[rows])
+                chunk = apply_predictions(chunk, predictions, rows, overwrite, min_confidence)
+            yield core.clean_feedback(chunk[core.KEEP_COLS].copy())
+
+
+def load_categorized_data(path, model, **kwargs):
+    # Same frame as core.load_data, for feedback whose labels come (partly) from the model;
+    # ready for core.calculate_priority_score.
+    frames = [chunk for chunk in iter_categorized_chunks(path, model, **kwargs) if len(chunk)]
+    if not frames:
+        return pd.DataFrame(columns=core.KEEP_COLS)
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def categorized_aggregates(path, model, **kwargs):
+    running = None
+    for chunk in iter_categorized_chunks(path, model, **kwargs):
+        if len(chunk):
+            running = core.merge_aggregates(running, core.aggregate_by_category(chunk))
+    if running is None:
+        running = core.aggregate_by_category(pd.DataFrame(columns=core.KEEP_COLS))
+    return running
+
+
+def train_classifier(paths, n_features=N_FEATURES, alpha=ALPHA, chunksize=core.STREAM_CHUNKSIZE):
+    # Fits both heads on every row of the given files that has Feedback text and the label.
+    model = FeedbackClassifier(n_features, alpha)
+    for path in paths:
+        for chunk in iter_text_chunks(path, chunksize):
+            model.partial_fit(chunk["Feedback"].to_numpy(dtype=object),
+                              chunk["Category"].astype(object), chunk["Sentiment"].astype(object))
+    return model
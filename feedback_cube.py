@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from core import NEGATIVE_CODE, SECONDS_PER_DAY, SENTIMENTS, encode_feedback, is_encoded, seconds_of_day
+
+UNKNOWN_SENTIMENT = "Unknown"
+
+
+def to_day(value):
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype("int64"))
+
+
+def week_start(days):
+    # Monday-based weeks, matching Period("W").start_time; day 0 (1970-01-01) was a Thursday.
+    return days - (days + 3) % 7
+
+
+class FeedbackCube:
+    # Non-empty (day, category, sentiment) cells holding row counts, sorted by day, built
+    # from encoded feedback (core.encode_feedback). Everything the dashboard draws is
+    # derived from these cells, so reruns scale with days x active categories rather
+    # than raw rows. Cells also sum their rows' time of day (clock, from a raw frame or
+    # passed alongside an encoded one), so category_aggregates returns the Date_Sum that
+    # core.aggregate_by_category returns for the raw rows, as parallel_scoring does.
+    def __init__(self, df, clock=None):
+        if not is_encoded(df):
+            clock = seconds_of_day(df["Date"])
+            df = encode_feedback(df)
+        self.categories = df["Category"].cat.categories
+        cat_codes = df["Category"].cat.codes.to_numpy().astype(np.int64)
+        sent_codes = df["Sentiment"].cat.codes.to_numpy().astype(np.int64)
+        self.sentiments = pd.Index(SENTIMENTS)
+        if (sent_codes < 0).any():
+            # Rows whose sentiment was not recognised at ingest keep their own bucket.
+            self.sentiments = self.sentiments.append(pd.Index([UNKNOWN_SENTIMENT]))
+            sent_codes = np.where(sent_codes < 0, len(SENTIMENTS), sent_codes)
+        self.negative = np.arange(len(self.sentiments)) == NEGATIVE_CODE
+
+        days = df["Day"].to_numpy().astype(np.int64)
+        valid = cat_codes >= 0
+        n_cat, n_sent = len(self.categories), len(self.sentiments)
+        first_day = int(days.min()) if len(days) else 0
+        keys = ((days[valid] - first_day) * n_cat + cat_codes[valid]) * n_sent + sent_codes[valid]
+        keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        self.clock_sum = np.zeros(len(keys))
+        if clock is not None:
+            self.clock_sum = np.bincount(inverse, weights=np.nan_to_num(np.asarray(clock, dtype=float)[valid]),
+                                         minlength=len(keys))
+
+        self.day = (keys // (n_cat * n_sent) + first_day).astype(np.int32)
+        self.cat = (keys // n_sent % n_cat).astype(np.int32)
+        self.sent = (keys % n_sent).astype(np.int8)
+        self.count = counts.astype(np.int64)
+
+    def __len__(self):
+        return len(self.count)
+
+    @property
+    def nbytes(self):
+        return self.day.nbytes + self.cat.nbytes + self.sent.nbytes + self.count.nbytes + self.clock_sum.nbytes
+
+    def _select(self, start=None, end=None, sentiments=None):
+        lo = 0 if start is None else np.searchsorted(self.day, to_day(start), side="left")
+        hi = len(self.day) if end is None else np.searchsorted(self.day, to_day(end), side="right")
+        selection = slice(lo, hi)
+        if sentiments is None:
+            return selection
+        codes = [i for i, s in enumerate(self.sentiments) if s in set(sentiments)]
+        return np.arange(lo, hi)[np.isin(self.sent[lo:hi], codes)]
+
+    def total(self, start=None, end=None, sentiments=None):
+        return int(self.count[self._select(start, end, sentiments)].sum())
+
+    def category_aggregates(self, start=None, end=None, sentiments=None):
+        # Same columns as core.aggregate_by_category, ready for core.score_categories.
+        sel = self._select(start, end, sentiments)
+        cat, sent, count = self.cat[sel], self.sent[sel], self.count[sel]
+        n = len(self.categories)
+        frequency = np.bincount(cat, weights=count, minlength=n).astype(np.int64)
+        negative = np.bincount(cat, weights=count * self.negative[sent], minlength=n).astype(np.int64)
+        seconds = self.day[sel] * count * float(SECONDS_PER_DAY) + self.clock_sum[sel]
+        date_sum = np.bincount(cat, weights=seconds, minlength=n)
+        present = frequency > 0
+        return pd.DataFrame({
+            "Frequency": frequency[present],
+            "Negative_Feedback": negative[present],
+            "Date_Sum": date_sum[present],
+            "Date_Count": frequency[present],
+        }, index=pd.Index(self.categories[present], name="Category"))
+
+    def category_sentiment_counts(self, start=None, end=None, sentiments=None):
+        # Equivalent to pd.crosstab(df["Category"], df["Sentiment"]) on the selected rows.
+        sel = self._select(start, end, sentiments)
+        n_sent = len(self.sentiments)
+        flat = np.bincount(self.cat[sel].astype(np.int64) * n_sent + self.sent[sel].astype(np.int64),
+                           weights=self.count[sel], minlength=len(self.categories) * n_sent)
+        table = pd.DataFrame(flat.reshape(len(self.categories), n_sent).astype(np.int64),
+                             index=pd.Index(self.categories, name="Category"),
+                             columns=pd.Index(self.sentiments, name="Sentiment"))
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        return table.sort_index().sort_index(axis=1)
+
+    def weekly_sentiment_counts(self, start=None, end=None, sentiments=None):
+        sel = self._select(start, end, sentiments)
+        weekly = pd.DataFrame({
+            "Week": week_start(self.day[sel].astype(np.int64)),
+            "Sentiment": self.sentiments[self.sent[sel]],
+            "Count": self.count[sel],
+        }).groupby(["Week", "Sentiment"], sort=True)["Count"].sum().reset_index()
+        weekly["Week"] = pd.to_datetime(weekly["Week"].to_numpy().astype("datetime64[D]"))
+        return weekly
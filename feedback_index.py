@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from core import encode_feedback, is_encoded, seconds_of_day
+from feedback_cube import FeedbackCube
+
+
+def day_to_timestamp(day):
+    return pd.Timestamp(np.datetime64(int(day), "D"))
+
+
+class FeedbackIndex:
+    # What the dashboard keeps per dataset: the FeedbackCube every chart and table is
+    # drawn from, the row count and the date bounds for the date picker. The encoded rows
+    # are not kept, so a cached dataset costs O(days x active categories), not O(rows).
+    def __init__(self, df):
+        clock = None
+        if not is_encoded(df):
+            clock = seconds_of_day(df["Date"])
+            df = encode_feedback(df)
+        days = df["Day"].to_numpy()
+        self.rows = len(df)
+        self.first_day = int(days.min()) if len(days) else 0
+        self.last_day = int(days.max()) if len(days) else 0
+        self.cube = FeedbackCube(df, clock)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def nbytes(self):
+        return self.cube.nbytes + int(self.cube.categories.memory_usage(deep=True))
+
+    @property
+    def min_date(self):
+        return day_to_timestamp(self.first_day) if self.rows else None
+
+    @property
+    def max_date(self):
+        return day_to_timestamp(self.last_day) if self.rows else None
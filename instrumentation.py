@@ -0,0 +1,157 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("feedback.diagnostics")
+
+# Set FEEDBACK_DIAGNOSTICS=1 to log every instrumented call process-wide; otherwise only
+# calls made inside a collect() block (e.g. the dashboard's Diagnostics panel) are measured.
+_log_all = os.environ.get("FEEDBACK_DIAGNOSTICS", "") not in ("", "0")
+_collector = contextvars.ContextVar("feedback_diagnostics", default=None)
+_local = threading.local()
+# tracemalloc is process-wide, so concurrent collect() blocks (one per dashboard session
+# with Diagnostics on) share it: the first starts tracing and the last one out stops it.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_owns_tracing = False
+# Peaks are process-wide too: a section that overlaps one on another thread reports a
+# peak that includes (or was reset by) that thread's allocations, and is marked shared.
+_open_sections = []
+
+
+def is_enabled():
+    return _log_all or _collector.get() is not None
+
+
+def _acquire_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _owns_tracing = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+
+def log_to_stderr():
+    # For entry points that do not configure logging themselves, such as the dashboard.
+    if _log_all and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+@contextmanager
+def collect():
+    records = []
+    token = _collector.set(records)
+    _acquire_tracing()
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+        _release_tracing()
+
+
+def _count_rows(value):
+    if isinstance(value, (str, bytes, dict)) or not hasattr(value, "__len__"):
+        return None
+    return len(value)
+
+
+@contextmanager
+def measure(stage, rows=None):
+    # Yields a dict the caller may update (e.g. "rows") before the block ends.
+    if not is_enabled():
+        yield {}
+        return
+
+    info = {"rows": rows}
+    stack = getattr(_local, "peaks", None)
+    if stack is None:
+        stack = _local.peaks = []
+    tracing = tracemalloc.is_tracing()
+    section = {"thread": threading.get_ident(), "shared": False}
+    if tracing:
+        with _tracing_lock:
+            if any(s["thread"] != section["thread"] for s in _open_sections):
+                section["shared"] = True
+                for s in _open_sections:
+                    s["shared"] = True
+            _open_sections.append(section)
+        # Fold the parent's peak so far into its stack slot before resetting for this stage.
+        if stack:
+            stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    stack.append(0)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        child_peak = stack.pop()
+        peak_bytes = None
+        if tracing:
+            with _tracing_lock:
+                _open_sections.remove(section)
+        if tracing and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+            peak_bytes = max(0, peak - base)
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+        record = {
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "rows": info.get("rows"),
+            "peak_bytes": peak_bytes,
+            "peak_shared": section["shared"] if peak_bytes is not None else None,
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+        }
+        records = _collector.get()
+        if records is not None:
+            records.append(record)
+        logger.info(json.dumps(record))
+
+
+def instrument(stage=None, rows=None):
+    # rows(result, *args, **kwargs) -> int overrides the default row count, which is the
+    # length of the first sized argument (or of the result when there is none).
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with measure(name) as info:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    info["rows"] = rows(result, *args, **kwargs)
+                else:
+                    sized = [n for n in map(_count_rows, args) if n is not None]
+                    info["rows"] = sized[0] if sized else _count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+if _log_all:
+    _acquire_tracing()
@@ -0,0 +1,244 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from csv_recovery import Quarantine
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib decoder is several times slower
+    orjson = None
+    _loads = json.loads
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+BLOCK_BYTES = 8 * 1024 * 1024
+COLUMNS = ["Category", "Sentiment", "Date"]
+# With the free text as well, for feedback_classifier; records then need a Category or a
+# Feedback text, since a missing Category can be predicted from the text.
+TEXT_COLUMNS = COLUMNS + ["Feedback"]
+# Record keys tried, in order, for each feedback column; dotted names reach into nested
+# objects (e.g. "feedback.category").
+FIELD_ALIASES = {
+    "Category": ["Category", "category", "topic", "type", "label"],
+    "Sentiment": ["Sentiment", "sentiment", "tone"],
+    "Date": ["Date", "date", "timestamp", "created_at", "createdAt", "time", "ts"],
+    "Feedback": ["Feedback", "feedback", "text", "comment", "message", "body"],
+    "User_ID": ["User_ID", "user_id", "userId", "user.id", "user"],
+}
+EPOCH_MS_THRESHOLD = 1e11
+
+
+def is_jsonl(path):
+    return isinstance(path, (str, os.PathLike)) and os.fspath(path).lower().endswith(JSONL_EXTENSIONS)
+
+
+def _lookup(record, name):
+    value = record
+    for part in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _column(records, names):
+    # First non-empty value per record across the alias names; later aliases are only
+    # looked up for the records still missing a value.
+    values = None
+    missing = []
+    for name in names:
+        if values is None:
+            values = [_lookup(r, name) for r in records] if "." in name else [r.get(name) for r in records]
+            missing = [i for i, v in enumerate(values) if v is None or v == ""]
+        else:
+            for i in missing:
+                values[i] = _lookup(records[i], name)
+            missing = [i for i in missing if values[i] is None or values[i] == ""]
+        if not missing:
+            break
+    for i in missing:
+        values[i] = None
+    return values if values is not None else [None] * len(records)
+
+
+def to_timestamps(values):
+    # ISO-8601 strings (offsets converted to naive UTC) and Unix epochs in seconds or,
+    # above EPOCH_MS_THRESHOLD, milliseconds. Anything else becomes NaT.
+    result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[us]")
+    numeric = np.fromiter((type(v) in (int, float) for v in values), dtype=bool, count=len(values))
+    text = np.fromiter((type(v) is str for v in values), dtype=bool, count=len(values))
+    if numeric.any():
+        epochs = np.array([v for v, n in zip(values, numeric) if n], dtype=float)
+        seconds = np.where(np.abs(epochs) >= EPOCH_MS_THRESHOLD, epochs / 1000.0, epochs)
+        result[numeric] = pd.to_datetime(seconds, unit="s", errors="coerce").to_numpy(dtype="datetime64[us]")
+    if text.any():
+        strings = pd.Series([v for v, t in zip(values, text) if t], dtype=object)
+        parsed = pd.to_datetime(strings, errors="coerce", format="ISO8601", utc=True).dt.tz_localize(None)
+        result[text] = parsed.to_numpy(dtype="datetime64[us]")
+    return pd.Series(result)
+
+
+def parse_records(lines, first_line=1, fields=None, quarantine=None, columns=COLUMNS):
+    # lines: raw bytes lines (no newline). Returns a frame with `columns` (COLUMNS, or
+    # TEXT_COLUMNS plus any other FIELD_ALIASES names as text); lines that are not JSON
+    # objects or have no category go to the quarantine.
+    if quarantine is None:
+        quarantine = Quarantine(max_samples=0)
+    records, line_numbers = [], []
+    for offset, line in enumerate(lines):
+        try:
+            record = _loads(line)
+        except ValueError:
+            if line.strip():
+                quarantine.add(first_line + offset, "invalid JSON", line.decode("utf-8", errors="replace"))
+            continue
+        if type(record) is not dict:
+            quarantine.add(first_line + offset, "not a JSON object", line.decode("utf-8", errors="replace"))
+            continue
+        records.append(record)
+        line_numbers.append(first_line + offset)
+
+    names = columns
+    columns = {column: _column(records, [fields[column]] if fields and column in fields else FIELD_ALIASES[column])
+               for column in names}
+    if None in columns["Category"]:
+        if "Feedback" in columns:
+            keep = [c is not None or t is not None for c, t in zip(columns["Category"], columns["Feedback"])]
+        else:
+            keep = [c is not None for c in columns["Category"]]
+        for number, kept in zip(line_numbers, keep):
+            if not kept:
+                quarantine.add(number, "missing Category", lines[number - first_line].decode("utf-8", errors="replace"))
+        columns = {column: [v for v, k in zip(values, keep) if k] for column, values in columns.items()}
+    frame = pd.DataFrame({
+        "Category": pd.Series(columns["Category"], dtype=object).astype("str"),
+        "Sentiment": pd.Series(columns["Sentiment"], dtype=object).astype("str"),
+        "Date": to_timestamps(columns["Date"]),
+    }, columns=COLUMNS)
+    for name in names[len(COLUMNS):]:
+        frame[name] = pd.Series(columns[name], dtype=object).astype("str")
+    return frame
+
+
+def _block_frames(f, fields, quarantine, block_size, columns=COLUMNS):
+    line_number = 1
+    leftover = b""
+    while True:
+        data = f.read(block_size)
+        buf = leftover + data
+        if data:
+            cut = buf.rfind(b"\n") + 1
+            buf, leftover = buf[:cut], buf[cut:]
+        lines = buf.split(b"\n")
+        if not lines[-1]:
+            lines.pop()
+        if lines:
+            yield parse_records(lines, line_number, fields, quarantine, columns)
+        line_number += len(lines)
+        if not data:
+            return
+
+
+def iter_jsonl_chunks(source, chunksize=None, fields=None, quarantine=None, block_size=BLOCK_BYTES,
+                      columns=COLUMNS):
+    # Decodes line-aligned blocks record by record; chunksize re-slices them into frames
+    # of that many rows (None: one frame per block). A final line without a newline is
+    # parsed as well.
+    f = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        buffered, rows = [], 0
+        for frame in _block_frames(f, fields, quarantine, block_size, columns):
+            if not chunksize:
+                if len(frame):
+                    yield frame
+                continue
+            buffered.append(frame)
+            rows += len(frame)
+            if rows >= chunksize:
+                merged = pd.concat(buffered, ignore_index=True)
+                full = rows - rows % chunksize
+                for start in range(0, full, chunksize):
+                    yield merged.iloc[start:start + chunksize]
+                buffered, rows = [merged.iloc[full:]], rows - full
+        if rows:
+            yield pd.concat(buffered, ignore_index=True)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_jsonl(source, fields=None, quarantine=None):
+    frames = list(iter_jsonl_chunks(source, fields=fields, quarantine=quarantine))
+    if not frames:
+        return parse_records([])
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+class JsonlTail:
+    # Follows a JSONL file that collectors keep appending to. Each poll() parses only the
+    # complete lines written since the previous one (a record still being written waits
+    # for its newline). A file that shrinks or is replaced is read again from the top.
+    # Records without a usable timestamp are dated when they are first seen.
+    def __init__(self, path, fields=None, quarantine=None, from_end=False):
+        self.path = path
+        self.fields = fields
+        self.quarantine = quarantine if quarantine is not None else Quarantine()
+        self.offset = 0
+        self.line_number = 1
+        self._inode = None
+        if from_end and os.path.exists(path):
+            with open(path, "rb") as f:
+                self._inode = os.fstat(f.fileno()).st_ino
+                position = 0
+                while True:
+                    data = f.read(BLOCK_BYTES)
+                    if not data:
+                        break
+                    newline = data.rfind(b"\n")
+                    if newline != -1:
+                        self.offset = position + newline + 1
+                        self.line_number += data.count(b"\n")
+                    position += len(data)
+
+    def poll(self, max_bytes=None):
+        # Reads BLOCK_BYTES at a time, carrying a block's unfinished last line into the
+        # next, so a large backlog is never held as one buffer. max_bytes caps how much
+        # one poll reads, except that a record longer than the cap is still read through
+        # its newline so the offset always advances; None reads to the end of the file.
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return parse_records([])
+        frames = []
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self.offset:
+                self._inode = stat.st_ino
+                self.offset = 0
+                self.line_number = 1
+            f.seek(self.offset)
+            remaining = max_bytes
+            leftover = b""
+            while remaining is None or remaining > 0 or not frames:
+                data = f.read(min(BLOCK_BYTES, remaining) if remaining and remaining > 0 else BLOCK_BYTES)
+                if not data:
+                    break
+                if remaining is not None:
+                    remaining -= len(data)
+                buf = leftover + data
+                end = buf.rfind(b"\n") + 1
+                leftover = buf[end:]
+                if not end:
+                    continue
+                lines = buf[:end - 1].split(b"\n")
+                frames.append(parse_records(lines, self.line_number, self.fields, self.quarantine))
+                self.offset += end
+                self.line_number += len(lines)
+        if not frames:
+            return parse_records([])
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        frame["Date"] = frame["Date"].fillna(pd.Timestamp.now().floor("s"))
+        return frame
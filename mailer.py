@@ -0,0 +1,125 @@
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+SENDGRID_API_URL = "https://api.sendgrid.com"
+SEND_PATH = "/v3/mail/send"
+MAX_PERSONALIZATIONS = 1000
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Longest wait honoured from a Retry-After header; sends run on the caller's thread.
+MAX_RETRY_DELAY = 30.0
+
+DeliveryResult = namedtuple("DeliveryResult", ["recipient", "success", "result"])
+
+
+def _never_sent(error):
+    # True when the connection failed before the request went out, so posting again
+    # cannot deliver the batch twice. A read timeout may follow an accepted send.
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    cause = error.args[0] if error.args else None
+    return isinstance(getattr(cause, "reason", cause), urllib3.exceptions.NewConnectionError)
+
+
+def default_subject():
+    return f"🎯 Weekly Feedback Priority Report - {datetime.now().strftime('%b %d, %Y')}"
+
+
+class ReportDispatcher:
+    # One pooled HTTP session shared by every send; recipients are grouped into
+    # SendGrid personalizations so a single request covers a whole batch.
+    def __init__(self, api_key, sender_email, base_url=SENDGRID_API_URL, max_workers=4,
+                 batch_size=100, max_retries=4, backoff=0.5, timeout=30, verify=True):
+        self.sender_email = sender_email
+        self.url = base_url.rstrip("/") + SEND_PATH
+        self.max_workers = max_workers
+        self.batch_size = max(1, min(batch_size, MAX_PERSONALIZATIONS))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.verify = verify
+        if not verify:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def build_payload(self, html_content, recipients, subject):
+        return {
+            "personalizations": [{"to": [{"email": email}]} for email in recipients],
+            "from": {"email": self.sender_email},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}],
+        }
+
+    def _retry_delay(self, attempt, response):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+        return min(self.backoff * (2 ** attempt) * (0.5 + random.random()), MAX_RETRY_DELAY)
+
+    def _post(self, payload):
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+                if not _never_sent(e):
+                    return False, error
+            else:
+                if response.status_code in (200, 201, 202):
+                    return True, response.status_code
+                error = f"SendGrid returned status code: {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    return False, error
+            if attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+        return False, error
+
+    def send(self, html_content, recipients, subject=None, on_result=None):
+        # on_result(result, done, total) runs on the calling thread, once per recipient,
+        # so it can safely drive UI widgets such as a Streamlit progress bar.
+        subject = subject or default_subject()
+        batches = [recipients[i:i + self.batch_size] for i in range(0, len(recipients), self.batch_size)]
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._post, self.build_payload(html_content, batch, subject)): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                try:
+                    success, result = future.result()
+                except Exception as e:
+                    success, result = False, str(e)
+                for email in futures[future]:
+                    delivery = DeliveryResult(email, success, result)
+                    results.append(delivery)
+                    if on_result is not None:
+                        on_result(delivery, len(results), len(recipients))
+        return results
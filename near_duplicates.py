@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+
+import core
+from feedback_classifier import hash_tokens, iter_text_chunks
+from jsonl_source import TEXT_COLUMNS
+
+DEDUP_COLUMNS = TEXT_COLUMNS + ["User_ID"]
+THRESHOLD = 0.8
+WINDOW_DAYS = 7
+NUM_PERM = 64
+EMPTY = np.iinfo(np.uint32).max
+# Comments per MinHash block; small enough that the (permutations x shingles) block
+# stays in cache.
+SIGNATURE_BLOCK = 256
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_GROUP_MIX = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def lsh_bands(num_perm, threshold, recall=0.95):
+    # (bands, rows) with bands * rows = num_perm: the most rows per band (fewest spurious
+    # candidates) that still make a pair at `threshold` a candidate with probability
+    # `recall`. Candidates are then verified on the full signature.
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    found = [o for o in options if 1 - (1 - threshold ** o[1]) ** o[0] >= recall]
+    return max(found, key=lambda o: o[1]) if found else options[0]
+
+
+def minhash_signatures(hashes, counts, a, b):
+    # (comments, len(a)) MinHash signatures of the shingle hashes laid out as hash_tokens
+    # returns them; comments without any shingle get EMPTY throughout. Each permutation
+    # is a multiply-shift hash (a * x + b mod 2**64, top 32 bits), which needs no modulo.
+    signatures = np.full((len(counts), len(a)), EMPTY, dtype=np.uint32)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    for start in range(0, len(counts), SIGNATURE_BLOCK):
+        stop = min(start + SIGNATURE_BLOCK, len(counts))
+        lo, hi = offsets[start], offsets[stop]
+        if lo == hi:
+            continue
+        permuted = np.multiply.outer(a, hashes[lo:hi])
+        permuted += b[:, None]
+        permuted >>= np.uint64(32)
+        nonempty = counts[start:stop] > 0
+        starts = (offsets[start:stop] - lo)[nonempty]
+        block = signatures[start:stop]
+        block[nonempty] = np.minimum.reduceat(permuted, starts, axis=1).T
+    return signatures
+
+
+def band_keys(signatures, groups, bands):
+    # One 64-bit key per (comment, band): the band's rows of the signature folded together
+    # with the comment's group, so only comments of the same group can share a bucket.
+    rows = signatures.shape[1] // bands
+    folded = signatures.reshape(len(signatures), bands, rows).astype(np.uint64)
+    keys = np.zeros((len(signatures), bands), dtype=np.uint64)
+    for i in range(rows):
+        keys = keys * _MIX + folded[:, :, i]
+    return (keys ^ (groups[:, None] * _GROUP_MIX)) + np.arange(bands, dtype=np.uint64) * _GROUP_MIX
+
+
+class _KeyTable:
+    # Band key -> owning comment, as sorted runs that are merged whenever a run is at
+    # least as large as the one before it (so there are O(log n) runs). Lookups are one
+    # searchsorted per run for a whole batch, instead of a dict access per key.
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(keys) for keys, _ in self.runs)
+
+    def lookup(self, keys):
+        # Sorted needles let searchsorted walk each run once instead of jumping around it.
+        order = np.argsort(keys)
+        keys = keys[order]
+        owners = np.full(len(keys), -1, dtype=np.int64)
+        for run_keys, run_owners in self.runs:
+            position = np.minimum(np.searchsorted(run_keys, keys), len(run_keys) - 1)
+            found = run_keys[position] == keys
+            owners[found] = run_owners[position[found]]
+        result = np.empty_like(owners)
+        result[order] = owners
+        return result
+
+    def add(self, keys, owners):
+        # keys must be new to the table and distinct.
+        if not len(keys):
+            return
+        order = np.argsort(keys)
+        self.runs.append((keys[order], owners[order]))
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= len(self.runs[-1][0]):
+            (k1, o1), (k2, o2) = self.runs.pop(), self.runs.pop()
+            keys, owners = np.concatenate([k2, k1]), np.concatenate([o2, o1])
+            order = np.argsort(keys, kind="stable")
+            self.runs.append((keys[order], owners[order]))
+
+
+class _Window:
+    # Index of one time window: band key -> the earliest comment holding it, plus every
+    # comment's signature, group and cluster, in growable arrays.
+    def __init__(self, num_perm):
+        self.owners = _KeyTable()
+        self.size = 0
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self.groups = np.empty(0, dtype=np.uint64)
+        self.clusters = np.empty(0, dtype=np.int64)
+
+    def _append(self, signatures, groups, clusters):
+        end = self.size + len(groups)
+        if end > len(self.groups):
+            capacity = max(end, 2 * len(self.groups), 1024)
+            self.signatures = np.resize(self.signatures, (capacity, self.signatures.shape[1]))
+            self.groups = np.resize(self.groups, capacity)
+            self.clusters = np.resize(self.clusters, capacity)
+        self.signatures[self.size:end] = signatures
+        self.groups[self.size:end] = groups
+        self.clusters[self.size:end] = clusters
+        self.size = end
+
+    def insert(self, signatures, groups, keys, threshold, next_cluster):
+        # Returns (clusters, repeats, next_cluster). A comment joins the cluster of the earliest
+        # earlier comment that shares a band key and a group with it and whose signature
+        # agrees on at least `threshold` of its positions; otherwise it starts a cluster.
+        n, bands = keys.shape
+        base = self.size
+        nonempty = signatures[:, 0] != EMPTY
+        docs = np.repeat(np.arange(n), bands)[np.repeat(nonempty, bands)]
+        flat = keys[nonempty].ravel()
+
+        prior = self.owners.lookup(flat)
+        _, first, inverse = np.unique(flat, return_index=True, return_inverse=True)
+        first_doc = docs[first][inverse]
+        candidate = np.where(prior >= 0, prior, np.where(first_doc < docs, base + first_doc, -1))
+
+        parent = np.full(n, -1, dtype=np.int64)
+        has = candidate >= 0
+        if has.any():
+            pairs = pd.DataFrame({"doc": docs[has], "candidate": candidate[has]}).drop_duplicates()
+            doc, cand = pairs["doc"].to_numpy(), pairs["candidate"].to_numpy()
+            old = cand < base
+            cand_signatures = np.empty((len(cand), signatures.shape[1]), dtype=np.uint32)
+            cand_groups = np.empty(len(cand), dtype=np.uint64)
+            cand_signatures[old] = self.signatures[cand[old]]
+            cand_groups[old] = self.groups[cand[old]]
+            cand_signatures[~old] = signatures[cand[~old] - base]
+            cand_groups[~old] = groups[cand[~old] - base]
+            similar = (cand_signatures == signatures[doc]).mean(axis=1) >= threshold
+            similar &= cand_groups == groups[doc]
+            if similar.any():
+                chosen = pd.Series(cand[similar]).groupby(doc[similar]).min()
+                parent[chosen.index.to_numpy()] = chosen.to_numpy()
+
+        # Resolve chains within the batch (a duplicate of a duplicate) by pointer jumping.
+        clusters = np.full(n, -1, dtype=np.int64)
+        starts = parent < 0
+        clusters[starts] = next_cluster + np.arange(starts.sum())
+        old = (parent >= 0) & (parent < base)
+        clusters[old] = self.clusters[parent[old]]
+        pending = parent >= base
+        link = np.where(pending, parent - base, np.arange(n))
+        while pending.any():
+            clusters[pending] = np.where(clusters[link[pending]] >= 0, clusters[link[pending]], -1)
+            pending &= clusters < 0
+            link[pending] = link[link[pending]]
+
+        # First holder of a key owns it; later batches only see owners from earlier ones.
+        new = (prior < 0) & (first_doc == docs)
+        self.owners.add(flat[new], base + docs[new])
+        self._append(signatures, groups, clusters)
+        return clusters, ~starts, next_cluster + int(starts.sum())
+
+
+class NearDuplicateIndex:
+    # MinHash/LSH index for collapsing repeated submissions of near-identical Feedback.
+    # Comments are compared only within their group: the same User_ID (when per_user;
+    # a comment without one is in a group of its own) and Category, in the same
+    # window_days-long window. Within a group, comments whose
+    # word unigram+bigram sets have an estimated Jaccard similarity of at least
+    # `threshold` share a cluster (single linkage, earliest comment first). Each
+    # comment is matched through its LSH band buckets rather than against every other
+    # comment, so an insert costs O(comments), and insert() can be fed batch after batch:
+    # the clusters are the same however the stream is split.
+    def __init__(self, threshold=THRESHOLD, window_days=WINDOW_DAYS, per_user=True, num_perm=NUM_PERM, seed=1):
+        self.threshold = threshold
+        self.window_days = window_days
+        self.per_user = per_user
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 64, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, num_perm, dtype=np.uint64)
+        self.windows = {}
+        self.comments = 0
+        self.clusters = 0
+
+    def __len__(self):
+        return self.comments
+
+    def window_of(self, dates):
+        # Whole windows since the epoch; comments without a date share window -1.
+        days = (pd.to_datetime(pd.Series(dates), cache=False) - core.EPOCH).dt.days.to_numpy(dtype=float, na_value=np.nan)
+        windows = np.floor(days / self.window_days)
+        return np.where(np.isnan(windows), -1, windows).astype(np.int64)
+
+    def insert(self, texts, categories, dates, users=None):
+        # Returns each comment's cluster id and whether it repeats an earlier comment.
+        texts = list(texts)
+        n = len(texts)
+        hashes, counts = hash_tokens(texts)
+        signatures = minhash_signatures(hashes, counts, self._a, self._b)
+        group_columns = {"Category": pd.Series(categories, dtype=object).reset_index(drop=True)}
+        missing = np.zeros(n, dtype=bool)
+        if self.per_user and users is not None:
+            users = pd.Series(users, dtype=object).reset_index(drop=True)
+            missing = (users.isna() | (users.astype(str).str.strip() == "")).to_numpy()
+            group_columns["User_ID"] = users.where(~missing, None)
+        groups = pd.util.hash_pandas_object(pd.DataFrame(group_columns), index=False).to_numpy(copy=True)
+        # Without a User_ID a comment is its own user (keyed by its position in the
+        # stream), so anonymous submissions are never collapsed into one another.
+        groups[missing] ^= (self.comments + np.flatnonzero(missing) + 1).astype(np.uint64) * _MIX
+        keys = band_keys(signatures, groups, self.bands)
+        windows = self.window_of(dates)
+
+        clusters = np.empty(n, dtype=np.int64)
+        repeats = np.zeros(n, dtype=bool)
+        for window in pd.unique(windows):
+            rows = np.flatnonzero(windows == window)
+            index = self.windows.get(window)
+            if index is None:
+                index = self.windows[window] = _Window(self.num_perm)
+            clusters[rows], repeats[rows], self.clusters = index.insert(
+                signatures[rows], groups[rows], keys[rows], self.threshold, self.clusters)
+        self.comments += n
+        return clusters, repeats
+
+    def insert_frame(self, df):
+        users = df["User_ID"] if "User_ID" in df.columns else None
+        return self.insert(df["Feedback"].to_numpy(dtype=object), df["Category"], df["Date"], users)
+
+    def expire(self, before):
+        # Drops the windows that end before `before` (a date); comments dated earlier
+        # than it can no longer be matched.
+        cutoff = self.window_of([before])[0]
+        for window in [w for w in self.windows if 0 <= w < cutoff]:
+            del self.windows[window]
+
+
+def dedup_chunk(index, chunk):
+    # Category aggregates of one chunk's cleaned rows with repeats left out, plus
+    # Raw_Frequency counting every row. Categories whose rows all repeat earlier chunks
+    # stay in with zero counts, so merged totals keep every category.
+    _, repeats = index.insert_frame(chunk)
+    raw = core.aggregate_by_category(core.clean_feedback(chunk[core.KEEP_COLS].copy()))
+    kept = core.aggregate_by_category(core.clean_feedback(chunk.loc[~repeats, core.KEEP_COLS].copy()))
+    agg = kept.reindex(raw.index, fill_value=0)
+    agg["Raw_Frequency"] = raw["Frequency"]
+    return agg
+
+
+def deduplicated_aggregates(path, index=None, chunksize=core.STREAM_CHUNKSIZE, quarantine=None):
+    # core.load_category_aggregates for a file with Feedback text (and ideally User_ID):
+    # Frequency, Negative_Feedback and the mean date count each near-duplicate cluster
+    # once; Raw_Frequency keeps the plain row count next to it.
+    if index is None:
+        index = NearDuplicateIndex()
+    running = None
+    for chunk in iter_text_chunks(path, chunksize, quarantine, columns=DEDUP_COLUMNS):
+        if len(chunk):
+            running = core.merge_aggregates(running, dedup_chunk(index, chunk))
+    if running is None:
+        running = core.aggregate_by_category(pd.DataFrame(columns=core.KEEP_COLS))
+        running["Raw_Frequency"] = running["Frequency"]
+    return running
+
+
+def deduplicate_feedback(df, index=None):
+    # The rows of df that do not repeat an earlier one, ready for calculate_priority_score.
+    _, repeats = (index or NearDuplicateIndex()).insert_frame(df)
+    return df.loc[~repeats].reset_index(drop=True)
+
+
+def deduplicated_frequency(df, index=None):
+    # Raw and deduplicated row counts per category, most-repeated first.
+    _, repeats = (index or NearDuplicateIndex()).insert_frame(df)
+    counts = pd.DataFrame({"Category": df["Category"].to_numpy(), "Repeat": repeats})
+    table = counts.groupby("Category", sort=False).agg(Frequency=("Repeat", "size"), Duplicates=("Repeat", "sum"))
+    table["Deduplicated_Frequency"] = table["Frequency"] - table["Duplicates"]
+    table = table[["Frequency", "Deduplicated_Frequency", "Duplicates"]].reset_index()
+    return table.sort_values("Duplicates", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import core
+from feedback_cube import UNKNOWN_SENTIMENT
+from jsonl_source import is_jsonl
+
+PARTITION_KINDS = ["rows", "category"]
+SENTIMENT_LABELS = core.SENTIMENTS + [UNKNOWN_SENTIMENT]
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def file_partitions(path, parts):
+    # Splits the data lines of a CSV/JSONL file into up to `parts` byte ranges that start
+    # and end on line boundaries. Returns the header line (empty for JSONL) and the ranges.
+    with open(path, "rb") as f:
+        header = b"" if is_jsonl(path) else f.readline()
+        size = os.fstat(f.fileno()).st_size
+        bounds = [len(header)]
+        for k in range(1, parts):
+            target = len(header) + (size - len(header)) * k // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+        bounds.append(max(size, len(header)))
+    return header, list(zip(bounds[:-1], bounds[1:]))
+
+
+def _segment_aggregates(path, header, start, end, chunksize):
+    with open(path, "rb") as f:
+        return core.segment_category_aggregates(f, header, start, end, chunksize, is_jsonl(path))
+
+
+def parallel_file_aggregates(path, workers=None, partitions=None, chunksize=core.STREAM_CHUNKSIZE):
+    # Same result as core.load_category_aggregates(path): each worker parses and
+    # aggregates one byte range, and the partials are merged in file order so
+    # categories keep their first-appearance order.
+    workers = workers or default_workers()
+    header, ranges = file_partitions(path, partitions or workers)
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        partials = pool.map(_segment_aggregates, repeat(path), repeat(header), starts, ends, repeat(chunksize))
+        return reduce(core.merge_aggregates, partials, None)
+
+
+def _share(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def _partition_totals(arrays, n_categories, part, parts, by):
+    # arrays: category codes, sentiment codes, days and, for frames that still carry a
+    # time of day, the seconds since midnight (NaN for a missing date).
+    if by == "rows":
+        lo, hi = len(arrays[0]) * part // parts, len(arrays[0]) * (part + 1) // parts
+        arrays = [a[lo:hi] for a in arrays]
+    else:
+        mine = arrays[0].astype(np.int64) % parts == part
+        arrays = [a[mine] for a in arrays]
+    keep = arrays[0] >= 0
+    cat, sent, day, *clock = [a[keep] for a in arrays]
+    cat = cat.astype(np.int64)
+    sent = sent.astype(np.int64)
+    sent[sent < 0] = len(SENTIMENT_LABELS) - 1
+    frequency = np.bincount(cat, minlength=n_categories)
+    if clock:
+        dated = ~np.isnan(clock[0])
+        date_count = np.bincount(cat[dated], minlength=n_categories)
+        clock_sum = np.bincount(cat[dated], weights=clock[0][dated], minlength=n_categories)
+        cat_dated, day = cat[dated], day[dated]
+    else:
+        date_count, clock_sum, cat_dated = frequency, np.zeros(n_categories), cat
+    return (
+        frequency,
+        np.bincount(cat, weights=sent == core.NEGATIVE_CODE, minlength=n_categories).astype(np.int64),
+        # Whole days summed exactly, converted to seconds once after the merge.
+        np.bincount(cat_dated, weights=day, minlength=n_categories),
+        np.bincount(cat * len(SENTIMENT_LABELS) + sent, minlength=n_categories * len(SENTIMENT_LABELS)),
+        clock_sum,
+        date_count,
+    )
+
+
+def _shared_partition_totals(spec, n_categories, part, parts, by):
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in spec]
+    try:
+        arrays = [np.ndarray((length,), dtype, buffer=block.buf)
+                  for block, (_, dtype, length) in zip(blocks, spec)]
+        totals = _partition_totals(arrays, n_categories, part, parts, by)
+        del arrays
+        return totals
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class PartitionedTotals:
+    # Category totals of an encoded frame summed over partitions scored in a process
+    # pool. by="rows" gives each worker a contiguous block of rows, i.e. a date range when
+    # the frame is day-sorted; by="category" gives each worker the categories whose code
+    # hashes to it. The encoded columns are placed in shared memory once, so workers read
+    # them without pickling the frame. A raw frame also ships each row's time of day, so
+    # Date_Sum keeps the exact seconds the serial aggregate_by_category sums rather than
+    # whole days.
+    def __init__(self, df, workers=None, partitions=None, by="rows"):
+        if by not in PARTITION_KINDS:
+            raise ValueError(f"by must be one of {PARTITION_KINDS}, got {by!r}")
+        encoded = df if core.is_encoded(df) else core.encode_feedback(df)
+        self.categories = encoded["Category"].cat.categories
+        columns = [
+            encoded["Category"].cat.codes.to_numpy(),
+            encoded["Sentiment"].cat.codes.to_numpy(),
+            encoded["Day"].to_numpy(),
+        ]
+        if encoded is not df:
+            columns.append(core.seconds_of_day(df["Date"]))
+        workers = workers or default_workers()
+        parts = partitions or workers
+        n = len(self.categories)
+
+        blocks = [_share(column) for column in columns]
+        try:
+            spec = [(block.name, column.dtype.str, len(column)) for block, column in zip(blocks, columns)]
+            with ProcessPoolExecutor(max_workers=min(workers, parts)) as pool:
+                results = list(pool.map(_shared_partition_totals, repeat(spec), repeat(n),
+                                        range(parts), repeat(parts), repeat(by)))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        self.frequency, self.negative, self.day_sum, cells, self.clock_sum, self.date_count = (
+            sum(partials) for partials in zip(*results))
+        self.cells = cells.reshape(n, len(SENTIMENT_LABELS))
+
+    def category_aggregates(self):
+        # Same frame as core.aggregate_by_category on the encoded rows.
+        present = self.frequency > 0
+        return pd.DataFrame({
+            "Frequency": self.frequency[present].astype("int64"),
+            "Negative_Feedback": self.negative[present].astype("int64"),
+            "Date_Sum": self.day_sum[present] * float(core.SECONDS_PER_DAY) + self.clock_sum[present],
+            "Date_Count": self.date_count[present].astype("int64"),
+        }, index=pd.Index(self.categories[present], name="Category"))
+
+    def category_sentiment_counts(self):
+        # Same table as FeedbackCube.category_sentiment_counts() (pd.crosstab of the rows).
+        table = pd.DataFrame(self.cells.astype(np.int64),
+                             index=pd.Index(self.categories, name="Category"),
+                             columns=pd.Index(SENTIMENT_LABELS, name="Sentiment"))
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        return table.sort_index().sort_index(axis=1)
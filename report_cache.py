@@ -0,0 +1,57 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+ReportArtifacts = namedtuple("ReportArtifacts", ["png", "chart_base64", "html"])
+
+
+def report_key(priority_df, insights, *extra):
+    # Content hash of the rows that reach the chart/email plus the insights text, so an
+    # unchanged report reuses its render across reruns and sessions.
+    digest = hashlib.sha1()
+    digest.update(json.dumps(list(map(str, priority_df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(priority_df, index=True).to_numpy().tobytes())
+    digest.update(json.dumps(insights, sort_keys=True, default=str).encode())
+    for value in extra:
+        digest.update(str(value).encode())
+    return digest.hexdigest()
+
+
+class ReportArtifactCache:
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            artifacts = self._entries.get(key)
+            if artifacts is not None:
+                self._entries.move_to_end(key)
+            return artifacts
+
+    def put(self, key, artifacts):
+        with self._lock:
+            self._entries[key] = artifacts
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        # build() runs outside the lock; two sessions racing on a cold key may both render,
+        # which is cheaper than serialising every render behind one lock.
+        artifacts = self.get(key)
+        if artifacts is None:
+            artifacts = build()
+            self.put(key, artifacts)
+        return artifacts
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+
+import pandas as pd
+
+import core
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; Parquet exports are then unavailable
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = 50_000
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "feedback-exports")
+EXPORT_TTL = 3600
+GZIP_LEVEL = 6
+# format: (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "jsonl": (".jsonl", "application/x-ndjson"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pq is not None]
+
+
+def parse_export_format(spec):
+    # "csv", "jsonl.gz", ... -> (format, gzip)
+    fmt, compress = (spec[:-3], True) if spec.endswith(".gz") else (spec, False)
+    if fmt not in available_formats():
+        raise ValueError(f"export format must be one of {available_formats()} (optionally + '.gz'), got {spec!r}")
+    return fmt, compress
+
+
+def export_filename(stem, fmt, compress=False):
+    return stem + EXPORT_FORMATS[fmt][0] + (".gz" if compress else "")
+
+
+def export_mime(fmt, compress=False):
+    return "application/gzip" if compress else EXPORT_FORMATS[fmt][1]
+
+
+def _csv_chunks(frames, columns):
+    yield pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8")
+    for frame in frames:
+        yield frame.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _jsonl_chunks(frames, columns):
+    for frame in frames:
+        yield frame.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+
+
+class _ChunkSink:
+    # Write-only file for pyarrow that hands back what was written since the last drain().
+    # tell() keeps counting across drains, as the Parquet footer records absolute offsets.
+    def __init__(self):
+        self.closed = False
+        self.position = 0
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_chunks(frames, columns):
+    # One row group per chunk; the schema comes from the first chunk, so every row group
+    # carries the same column types.
+    if pq is None:
+        raise ImportError("Parquet export needs pyarrow")
+    sink = _ChunkSink()
+    writer = None
+    for frame in frames:
+        if writer is None:
+            schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        yield sink.drain()
+    if writer is None:
+        schema = pa.schema([(c, pa.string()) for c in columns])
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    writer.close()
+    yield sink.drain()
+
+
+def _gzipped(chunks, level=GZIP_LEVEL):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(agg, fmt="csv", compress=False, now=None, top=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # The priority ranking of `agg` (or its first `top` rows) encoded as a stream of byte
+    # chunks. Rows are scored once, then formatted chunk_rows at a time as the consumer
+    # pulls, so memory stays at one chunk whatever the number of categories.
+    writers = {"csv": _csv_chunks, "jsonl": _jsonl_chunks, "parquet": _parquet_chunks}
+    if fmt not in writers:
+        raise ValueError(f"fmt must be one of {list(writers)}, got {fmt!r}")
+    chunks = writers[fmt](core.iter_priority_ranking(agg, now, chunk_rows, top), core.priority_columns(agg))
+    return _gzipped(chunks) if compress else chunks
+
+
+def write_export(agg, path, fmt="csv", compress=False, now=None, top=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Written next to the target and renamed into place, so a reader never sees half a file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in iter_export(agg, fmt, compress, now, top, chunk_rows):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size
+
+
+def export_path(key, fmt, compress=False, directory=EXPORT_DIR):
+    # Stable file name for one export (dataset version, filter, rows, format), so every
+    # session asking for the same download reuses the same file.
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, export_filename(digest, fmt, compress))
+
+
+def prune_exports(directory=EXPORT_DIR, ttl=EXPORT_TTL):
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - ttl
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
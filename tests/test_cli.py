@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import cli
+
+HEADER = "Category,Sentiment,Date\n"
+
+
+@pytest.mark.parametrize("name", ["events.csv", "events.jsonl"])
+def test_follow_decayed_parses_only_appended_records(tmp_path, name):
+    path = tmp_path / name
+    rows = [("Login", "Negative", "2026-10-01"), ("Billing", "Positive", "2026-10-02"),
+            ("Login", "Neutral", "2026-10-03")]
+
+    def write(records, mode):
+        with open(path, mode) as f:
+            if name.endswith(".csv"):
+                f.write((HEADER if mode == "w" else "") + "".join(",".join(r) + "\n" for r in records))
+            else:
+                f.write("".join(pd.Series(dict(zip(["Category", "Sentiment", "Date"], r))).to_json() + "\n"
+                                for r in records))
+
+    write(rows[:2], "w")
+    follow = cli.follow_file(str(path), str(tmp_path / "out"), ["csv"], "decayed", 0, polls=3)
+    assert next(follow)["rows"] == 2
+    write(rows[2:], "a")
+    assert next(follow)["rows"] == 3
+    assert next(follow)["rows"] == 3
+    follow.close()
+
+    agg, total = cli.load_aggregates(str(path), "decayed", 14.0)
+    assert total == 3
+    assert set(agg.index) == {"Login", "Billing"}
+
+
+@pytest.mark.parametrize("mode", ["parallel", "classify", "dedup"])
+def test_follow_rejects_modes_it_cannot_keep_up_to_date(tmp_path, mode, capsys):
+    path = tmp_path / "feedback.csv"
+    path.write_text(HEADER + "Login,Negative,2026-10-01\n")
+    with pytest.raises(SystemExit):
+        cli.main([str(path), "--mode", mode, "--follow", "1", "--classifier", "model.npz"])
+    assert "--follow supports" in capsys.readouterr().err
+
+
+def test_dedup_full_ranking_keeps_raw_frequency(tmp_path):
+    path = tmp_path / "feedback.csv"
+    path.write_text("Category,Sentiment,Date,Feedback,User_ID\n"
+                    + "Login,Negative,2026-10-01,cannot log in since the update,u1\n" * 3
+                    + "Billing,Positive,2026-10-02,charged twice,u2\n")
+    outputs = cli.score_file(str(path), str(tmp_path), ["csv"], "dedup", full_ranking=True)["outputs"]
+    ranking, priority = (pd.read_csv(p) for p in outputs)
+    assert list(ranking.columns) == list(priority.columns)
+    assert ranking.set_index("Category")[["Frequency", "Raw_Frequency"]].loc["Login"].tolist() == [1, 3]
@@ -0,0 +1,72 @@
+import io
+
+import pandas as pd
+import pytest
+
+from csv_recovery import Quarantine, read_csv_tolerant
+
+COLUMNS = ["Category", "Sentiment", "Date", "Feedback"]
+HEADER = b"Category,Sentiment,Date,Feedback\n"
+
+
+def read(data, block_size):
+    quarantine = Quarantine()
+    df = read_csv_tolerant(io.BytesIO(data), COLUMNS, quarantine=quarantine, block_size=block_size)
+    return df, quarantine
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1 << 20])
+def test_quoted_newlines_parse_like_read_csv(block_size):
+    data = HEADER + (
+        b'A,Negative,2024-01-01,"line one\nline two"\n'
+        b"B,Positive,2024-01-02,plain\n"
+        b'C,Neutral,2024-01-03,"with ""quotes"", a comma\n\nand a blank line"\n'
+        b'D,Negative,2024-01-04,"no final newline"'
+    )
+    df, quarantine = read(data, block_size)
+    assert len(quarantine) == 0
+    expected = pd.read_csv(io.BytesIO(data), dtype=str)
+    pd.testing.assert_frame_equal(df.astype(str), expected[COLUMNS])
+    assert df["Feedback"][0] == "line one\nline two"
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 64, 1 << 20])
+def test_stray_quotes_quarantine_only_their_line(block_size):
+    data = HEADER + (
+        b'A,Negative,2024-01-01,"stray\n'
+        b"B,Positive,2024-01-02,plain\n"
+        b'C,Neutral,2024-01-03,"spans\ntwo lines"\n'
+        b"D,Negative,2024-01-04,x,extra\n"
+        b'E,Negative,2024-01-05,"never closed\n'
+        b"F,Negative,2024-01-06,fine\n"
+    )
+    df, quarantine = read(data, block_size)
+    assert list(df["Category"]) == ["B", "C", "D", "F"]
+    assert [(int(line), reason) for line, reason, _ in quarantine.samples] == [
+        (2, "unbalanced quote"), (7, "unbalanced quote")]
+
+
+def test_quote_open_past_record_limit_is_stray():
+    data = HEADER + b'A,Negative,2024-01-01,"opened\n' + b"B,Positive,2024-01-02,plain\n" * 150 + \
+        b'C,Neutral,2024-01-03,closed"\n'
+    df, quarantine = read(data, 1 << 20)
+    assert len(df) == 150
+    assert [reason for _, reason, _ in quarantine.samples] == ["unbalanced quote"] * 2
+
+
+@pytest.mark.parametrize("block_size", [1, 64, 1 << 20])
+def test_extra_fields_after_wanted_columns_are_kept(block_size):
+    # feedback.csv line 36: an unquoted comma in Feedback gives 8 fields under 7 headers.
+    data = (
+        b"Category,Sentiment,Date,Feedback,User_ID,Platform,Priority\n"
+        b"Login Issues,Negative,2025-09-29,Session expires too quickly, have to login multiple times,"
+        b"USER_3456,iOS,High\n"
+        b"Other,Positive,2025-09-30,fine,USER_1,Web,Low\n"
+        b"Short,Positive\n"
+    )
+    quarantine = Quarantine()
+    columns = ["Category", "Sentiment", "Date"]
+    df = read_csv_tolerant(io.BytesIO(data), columns, quarantine=quarantine, block_size=block_size)
+    expected = pd.read_csv(io.BytesIO(data), usecols=columns, index_col=False, dtype=str).iloc[:2]
+    pd.testing.assert_frame_equal(df.astype(str), expected[columns])
+    assert [reason for _, reason, _ in quarantine.samples] == ["expected 7 fields, saw 2"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from decayed_scores import DecayedScores, direct_decayed_aggregates
+
+NOW = pd.Timestamp("2026-10-17")
+
+
+def shuffled_feedback(rows=5_000, categories=30, seed=0):
+    # Timestamps out of order, with a time of day, and sentiments in mixed case.
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Category": [f"Category {i}" for i in rng.integers(0, categories, rows)],
+        "Sentiment": rng.choice(["Positive", "Neutral", "Negative", "negative"], rows),
+        "Date": NOW - pd.to_timedelta(rng.integers(0, 90 * 86400, rows), unit="s"),
+    })
+
+
+def add_each(df, half_life):
+    scorer = DecayedScores(half_life)
+    seconds = (df["Date"] - core.EPOCH).dt.total_seconds()
+    for category, sentiment, when in zip(df["Category"], df["Sentiment"], seconds):
+        scorer.add(category, sentiment, when)
+    return scorer
+
+
+def add_frame(df, half_life, batches=4):
+    scorer = DecayedScores(half_life)
+    for batch in np.array_split(np.arange(len(df)), batches):
+        scorer.update_frame(df.iloc[batch])
+    return scorer
+
+
+@pytest.mark.parametrize("feed", [add_each, add_frame])
+def test_no_decay_equals_static_aggregates(feed):
+    df = shuffled_feedback()
+    scorer = feed(df, None)
+    expected = core.aggregate_by_category(df)
+    got = scorer.aggregates(NOW)
+    pd.testing.assert_frame_equal(got.loc[expected.index], expected, check_names=False)
+    pd.testing.assert_frame_equal(scorer.scores(NOW), core.score_categories(expected, NOW))
+    assert scorer.events == len(df)
+
+
+@pytest.mark.parametrize("feed", [add_each, add_frame])
+@pytest.mark.parametrize("half_life", [1.0, 14.0])
+def test_decay_matches_direct_recomputation(feed, half_life):
+    df = shuffled_feedback()
+    expected = direct_decayed_aggregates(df, half_life, NOW)
+    got = feed(df, half_life).aggregates(NOW).loc[expected.index]
+    np.testing.assert_allclose(got.to_numpy(), expected[got.columns].to_numpy(), rtol=1e-9)
+
+
+def test_late_event_is_discounted_to_the_counters_time():
+    scorer = DecayedScores(1.0)
+    scorer.add("Login", "Negative", NOW)
+    scorer.add("Login", "Positive", NOW - pd.Timedelta(days=1))
+    agg = scorer.aggregates(NOW)
+    assert agg.loc["Login", "Frequency"] == pytest.approx(1.5)
+    assert agg.loc["Login", "Negative_Feedback"] == pytest.approx(1.0)
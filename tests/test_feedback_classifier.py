@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from feedback_classifier import FeedbackClassifier
+
+TEXTS = {
+    "Login Issues": ["cannot log in after the update", "password reset email never arrives",
+                     "login page keeps spinning"],
+    "Payment Failed": ["card was declined at checkout", "charged twice for one order",
+                       "refund has not arrived yet"],
+    "App Crashes": ["app crashes when opening settings", "crash on startup every time",
+                    "the app freezes and closes"],
+}
+
+
+def labelled(repeat=4):
+    rows = [(text, category, "Negative" if i % 2 else "positive")
+            for category, texts in TEXTS.items() for i, text in enumerate(texts)] * repeat
+    return pd.DataFrame(rows, columns=["Feedback", "Category", "Sentiment"])
+
+
+def fit(frames, n_features=1024):
+    model = FeedbackClassifier(n_features)
+    for df in frames:
+        model.partial_fit(df["Feedback"], df["Category"], df["Sentiment"])
+    return model
+
+
+def test_partial_fit_over_batches_matches_one_fit():
+    df = labelled()
+    whole = fit([df])
+    split = fit([df.iloc[start:start + 5] for start in range(0, len(df), 5)])
+    for name in ("category", "sentiment"):
+        a, b = getattr(whole, name), getattr(split, name)
+        assert a.classes == b.classes
+        np.testing.assert_array_equal(a.class_counts, b.class_counts)
+        np.testing.assert_array_equal(a.feature_counts, b.feature_counts)
+
+
+def test_train_predict_save_load_round_trip(tmp_path):
+    model = fit([labelled()])
+    texts = ["my card was declined", "the app crashes on startup", "cannot log in"]
+    predicted = model.predict(texts)
+    assert list(predicted["Category"]) == ["Payment Failed", "App Crashes", "Login Issues"]
+    assert set(predicted["Sentiment"]) <= {"Positive", "Negative"}
+
+    path = tmp_path / "model.npz"
+    model.save(path)
+    loaded = FeedbackClassifier.load(path)
+    pd.testing.assert_frame_equal(loaded.predict(texts), predicted, atol=1e-5)
+
+    # A loaded model keeps training, and new classes still fit in.
+    more = pd.DataFrame({"Feedback": ["dark mode please"] * 3, "Category": ["Feature Request"] * 3,
+                         "Sentiment": ["Neutral"] * 3})
+    loaded.partial_fit(more["Feedback"], more["Category"], more["Sentiment"])
+    assert loaded.predict(["please add dark mode"])["Category"][0] == "Feature Request"
+    assert loaded.category.feature_counts.shape == (1024, 4)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+import core
+from feedback_cube import FeedbackCube
+from feedback_index import FeedbackIndex
+
+
+def test_index_keeps_cube_and_date_bounds_only():
+    df = pd.DataFrame({
+        "Category": ["Login", "Billing", "Login", "Login"],
+        "Sentiment": ["Negative", "Positive", "Neutral", "Negative"],
+        "Date": pd.to_datetime(["2026-10-03 09:00", "2026-10-01 13:00", "2026-10-05 00:00", "2026-10-02 08:30"]),
+    })
+    index = FeedbackIndex(df)
+    assert len(index) == 4
+    assert (index.min_date, index.max_date) == (pd.Timestamp("2026-10-01"), pd.Timestamp("2026-10-05"))
+    assert not hasattr(index, "frame")
+    pd.testing.assert_frame_equal(index.cube.category_aggregates(), core.aggregate_by_category(df), check_like=True)
+
+
+def test_cube_scores_match_core_on_timestamped_rows():
+    # Categories whose mean age straddles a whole day score differently at day resolution.
+    df = pd.DataFrame({
+        "Category": ["Login", "Login", "Billing", "Billing", "Crashes"],
+        "Sentiment": ["Negative", "Positive", "Negative", "Negative", "Neutral"],
+        "Date": pd.to_datetime(["2026-10-10 23:00", "2026-10-12 22:30", "2026-10-15 18:00",
+                                "2026-10-16 06:00", "2026-10-01 12:00"]),
+    })
+    now = pd.Timestamp("2026-10-17 08:00")
+    expected = core.score_categories(core.aggregate_by_category(df), now)
+    pd.testing.assert_frame_equal(core.score_categories(FeedbackIndex(df).cube.category_aggregates(), now), expected)
+    clock = core.seconds_of_day(df["Date"])
+    encoded = core.score_categories(FeedbackCube(core.encode_feedback(df), clock).category_aggregates(), now)
+    pd.testing.assert_frame_equal(encoded, expected)
+    cube = FeedbackCube(df)
+    selected = cube.category_aggregates(start="2026-10-12", end="2026-10-16")
+    pd.testing.assert_frame_equal(selected, core.aggregate_by_category(df.iloc[1:4]), check_like=True)
+
+
+def test_empty_index():
+    index = FeedbackIndex(pd.DataFrame({"Category": [], "Sentiment": [], "Date": pd.to_datetime([])}))
+    assert len(index) == 0
+    assert index.min_date is None and index.max_date is None
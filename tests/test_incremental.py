@@ -0,0 +1,33 @@
+import pandas as pd
+
+import core
+
+HEADER = "Category,Sentiment,Date\n"
+
+
+def incremental(path):
+    return core.update_category_aggregates(str(path)).sort_index()
+
+
+def full(path):
+    return core.load_category_aggregates(str(path)).sort_index()
+
+
+def test_unterminated_last_line_is_counted(tmp_path):
+    path = tmp_path / "feedback.csv"
+    path.write_text(HEADER + "Login,Negative,2026-10-01\nBilling,Positive,2026-10-02")
+    pd.testing.assert_frame_equal(incremental(path), full(path))
+    assert incremental(path)["Frequency"].sum() == 2
+
+
+def test_completed_last_line_is_counted_once(tmp_path):
+    path = tmp_path / "feedback.csv"
+    path.write_text(HEADER + "Login,Negative,2026-10-01\nBilling,Posi")
+    incremental(path)
+    with open(path, "a") as f:
+        f.write("tive,2026-10-02\nLogin,Neutral,2026-10-03\nBilling,Negative,2026-10-04")
+    pd.testing.assert_frame_equal(incremental(path), full(path))
+    with open(path, "a") as f:
+        f.write("\n")
+    pd.testing.assert_frame_equal(incremental(path), full(path))
+    assert incremental(path)["Frequency"].to_dict() == {"Billing": 2, "Login": 2}
@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import tracemalloc
+
+from instrumentation import collect, measure
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(256)]
+
+
+def test_tracing_outlives_a_collector_that_leaves_early():
+    # Two dashboard sessions: the one that turned Diagnostics on first leaves first.
+    entered, left = threading.Event(), threading.Event()
+    results = {}
+
+    def early():
+        with collect():
+            entered.set()
+            results["late_entered"].wait(5)
+
+    def late():
+        entered.wait(5)
+        with collect() as records:
+            results["late_entered"].set()
+            left.wait(5)
+            with measure("late"):
+                allocate()
+        results["late"] = records
+
+    results["late_entered"] = threading.Event()
+    threads = [threading.Thread(target=early), threading.Thread(target=late)]
+    for thread in threads:
+        thread.start()
+    threads[0].join()
+    left.set()
+    threads[1].join()
+    assert results["late"][0]["peak_bytes"] > 256 * 1024
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        with collect():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_overlapping_sections_mark_their_peak_shared():
+    inside, done = threading.Event(), threading.Event()
+    results = {}
+
+    def other():
+        with collect() as records:
+            with measure("other"):
+                inside.set()
+                done.wait(5)
+        results["other"] = records
+
+    thread = threading.Thread(target=other)
+    with collect() as records:
+        with measure("alone"):
+            allocate()
+        thread.start()
+        inside.wait(5)
+        with measure("overlapped"):
+            allocate()
+        done.set()
+        thread.join()
+    assert [(r["stage"], r["peak_shared"]) for r in records] == [("alone", False), ("overlapped", True)]
+    assert results["other"][0]["peak_shared"] is True
+
+
+def test_diagnostics_env_var_traces_and_logs():
+    script = (
+        "import instrumentation\n"
+        "instrumentation.log_to_stderr()\n"
+        "with instrumentation.measure('stage'):\n"
+        "    data = [bytearray(1024) for _ in range(256)]\n"
+    )
+    env = dict(os.environ, FEEDBACK_DIAGNOSTICS="1", PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    record = json.loads(result.stderr.split("feedback.diagnostics: ", 1)[1])
+    assert record["stage"] == "stage"
+    assert record["peak_bytes"] > 256 * 1024
@@ -0,0 +1,77 @@
+import json
+
+import pandas as pd
+
+import jsonl_source
+from jsonl_source import JsonlTail, read_jsonl
+
+
+def write_records(path, records, mode="w", newline=True):
+    with open(path, mode) as f:
+        f.write("\n".join(json.dumps(r) for r in records) + ("\n" if newline else ""))
+
+
+def records(start, stop):
+    return [{"category": f"c{i % 7}", "sentiment": "Negative", "timestamp": f"2026-10-{1 + i % 28:02d}",
+             "text": "x" * (i % 50)} for i in range(start, stop)]
+
+
+def test_poll_reads_in_bounded_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(jsonl_source, "BLOCK_BYTES", 64)
+    reads = []
+    real_open = open
+
+    class Recording:
+        def __init__(self, f):
+            self._f = f
+
+        def read(self, size=-1):
+            reads.append(size)
+            return self._f.read(size)
+
+        def __getattr__(self, name):
+            return getattr(self._f, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self._f.close()
+
+    monkeypatch.setattr(jsonl_source, "open", lambda *a, **k: Recording(real_open(*a, **k)), raising=False)
+    path = tmp_path / "events.jsonl"
+    write_records(path, records(0, 500))
+    tail = JsonlTail(str(path))
+    frame = tail.poll()
+    assert reads and all(0 < size <= 64 for size in reads)
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(frame, read_jsonl(str(path)))
+
+
+def test_poll_waits_for_unfinished_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(jsonl_source, "BLOCK_BYTES", 100)
+    path = tmp_path / "events.jsonl"
+    write_records(path, records(0, 30), newline=False)
+    tail = JsonlTail(str(path))
+    assert len(tail.poll()) == 29
+    with open(path, "a") as f:
+        f.write("\n")
+    write_records(path, records(30, 40), mode="a")
+    assert len(tail.poll()) == 11
+    assert len(tail.poll()) == 0
+    assert tail.line_number == 41
+
+
+def test_poll_max_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(jsonl_source, "BLOCK_BYTES", 64)
+    path = tmp_path / "events.jsonl"
+    write_records(path, records(0, 100))
+    tail = JsonlTail(str(path))
+    polled = [len(tail.poll(max_bytes=1000)) for _ in range(20)]
+    assert 0 < polled[0] < 100
+    assert sum(polled) == 100
+
+    # A record longer than max_bytes is still consumed, one per poll.
+    long_record = {"category": "Long", "sentiment": "Negative", "timestamp": "2026-10-01", "text": "x" * 200}
+    write_records(path, [long_record] * 3, mode="a")
+    assert [len(tail.poll(max_bytes=100)) for _ in range(5)] == [1, 1, 1, 0, 0]
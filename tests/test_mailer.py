@@ -0,0 +1,118 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import mailer
+from mailer import ReportDispatcher
+
+
+class MockSendGrid(BaseHTTPRequestHandler):
+    # Replies with the next scripted (status, headers, delay) for each POST and records
+    # the request bodies.
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append(body)
+            status, headers, delay = server.script.pop(0) if server.script else (202, {}, 0)
+        time.sleep(delay)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sendgrid():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockSendGrid)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def dispatcher(url, **kwargs):
+    kwargs.setdefault("backoff", 0.01)
+    return ReportDispatcher("key", "sender@example.com", base_url=url, **kwargs)
+
+
+def test_recipients_are_batched_into_personalizations(sendgrid):
+    emails = [f"user{i}@example.com" for i in range(25)]
+    progress = []
+    with dispatcher(sendgrid.url, batch_size=10) as d:
+        results = d.send("<p>report</p>", emails, subject="Report",
+                         on_result=lambda delivery, done, total: progress.append((done, total)))
+    assert sorted(len(body["personalizations"]) for body in sendgrid.requests) == [5, 10, 10]
+    sent = [p["to"][0]["email"] for body in sendgrid.requests for p in body["personalizations"]]
+    assert sorted(sent) == sorted(emails)
+    assert all(r.success and r.result == 202 for r in results)
+    assert progress[-1] == (25, 25)
+    assert sendgrid.requests[0]["subject"] == "Report"
+
+
+def test_429_is_retried_after_retry_after(sendgrid):
+    sendgrid.script = [(429, {"Retry-After": "0.05"}, 0)]
+    with dispatcher(sendgrid.url) as d:
+        [result] = d.send("<p>report</p>", ["user@example.com"])
+    assert result.success
+    assert len(sendgrid.requests) == 2
+
+
+def test_errors_are_surfaced_per_recipient(sendgrid):
+    sendgrid.script = [(400, {}, 0)]
+    with dispatcher(sendgrid.url, batch_size=2) as d:
+        results = d.send("<p>report</p>", ["a@example.com", "b@example.com"])
+    assert [r.success for r in results] == [False, False]
+    assert all(r.result == "SendGrid returned status code: 400" for r in results)
+    assert len(sendgrid.requests) == 1
+
+
+def test_retries_give_up_with_the_last_error(sendgrid):
+    sendgrid.script = [(503, {}, 0)] * 3
+    with dispatcher(sendgrid.url, max_retries=2) as d:
+        [result] = d.send("<p>report</p>", ["user@example.com"])
+    assert not result.success
+    assert "503" in result.result
+    assert len(sendgrid.requests) == 3
+
+
+def test_read_timeout_is_not_resent(sendgrid):
+    sendgrid.script = [(202, {}, 0.5)]
+    with dispatcher(sendgrid.url, timeout=0.1) as d:
+        [result] = d.send("<p>report</p>", ["user@example.com"])
+    time.sleep(0.5)
+    assert not result.success
+    assert len(sendgrid.requests) == 1
+
+
+def test_connection_refused_is_retried(monkeypatch):
+    waits = []
+    monkeypatch.setattr(mailer.time, "sleep", waits.append)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    with dispatcher(f"http://127.0.0.1:{port}", max_retries=2) as d:
+        [result] = d.send("<p>report</p>", ["user@example.com"])
+    assert not result.success
+    assert len(waits) == 2
+
+
+def test_retry_after_is_clamped():
+    class Response:
+        headers = {"Retry-After": "86400"}
+
+    with dispatcher("http://127.0.0.1:1") as d:
+        assert d._retry_delay(0, Response()) == mailer.MAX_RETRY_DELAY
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from near_duplicates import NearDuplicateIndex
+
+BASE = "the app crashes every time I open the settings page after the latest update on my phone"
+
+
+def submissions(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    texts = [f"{BASE} {rng.integers(20)}" if rng.random() < 0.5 else f"comment number {i} about billing"
+             for i in range(rows)]
+    return pd.DataFrame({
+        "Feedback": texts,
+        "Category": rng.choice(["Crashes", "Billing"], rows),
+        "Date": pd.Timestamp("2026-10-01") + pd.to_timedelta(rng.integers(0, 20, rows), unit="D"),
+        "User_ID": rng.choice(["u1", "u2", "u3", None], rows),
+    })
+
+
+@pytest.mark.parametrize("batch", [1, 7, 64])
+def test_clusters_do_not_depend_on_batch_split(batch):
+    df = submissions(300)
+    whole = NearDuplicateIndex().insert_frame(df)
+    index = NearDuplicateIndex()
+    parts = [index.insert_frame(df.iloc[start:start + batch]) for start in range(0, len(df), batch)]
+    # Cluster ids are numbered in insertion order, so compare the partition they induce.
+    split = np.concatenate([p[0] for p in parts])
+    np.testing.assert_array_equal(pd.factorize(split)[0], pd.factorize(whole[0])[0])
+    np.testing.assert_array_equal(np.concatenate([p[1] for p in parts]), whole[1])
+
+
+def test_threshold_collapses_near_identical_comments():
+    texts = [BASE, BASE + " again", "billing charged me twice for one month", BASE]
+    _, repeats = NearDuplicateIndex().insert(texts, ["Crashes", "Crashes", "Crashes", "Other"],
+                                             ["2026-10-01"] * 4, ["u1"] * 4)
+    assert list(repeats) == [False, True, False, False]
+    _, repeats = NearDuplicateIndex(threshold=0.99).insert(texts[:2], ["Crashes"] * 2, ["2026-10-01"] * 2)
+    assert list(repeats) == [False, False]
+
+
+def test_comments_are_grouped_per_user():
+    users = ["u1", "u1", "u2", None, None, "", float("nan")]
+    _, repeats = NearDuplicateIndex().insert([BASE] * len(users), ["Crashes"] * len(users),
+                                             ["2026-10-01"] * len(users), users)
+    # Only u1's second submission repeats; comments without a User_ID never match each other.
+    assert list(repeats) == [False, True, False, False, False, False, False]
+    _, repeats = NearDuplicateIndex(per_user=False).insert([BASE] * 3, ["Crashes"] * 3, ["2026-10-01"] * 3,
+                                                           ["u1", "u2", None])
+    assert list(repeats) == [False, True, True]
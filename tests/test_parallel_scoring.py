@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from feedback_cube import FeedbackCube
+from parallel_scoring import PartitionedTotals, parallel_file_aggregates
+
+
+def timestamped_frame(rows=20_000, categories=40, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2026-10-01") - pd.to_timedelta(rng.integers(0, 90 * 86400, rows), unit="s")
+    return pd.DataFrame({
+        "Category": [f"c{i}" for i in rng.integers(0, categories, rows)],
+        "Sentiment": rng.choice(["Positive", "Neutral", "Negative"], rows),
+        "Date": dates,
+    })
+
+
+@pytest.mark.parametrize("by", ["rows", "category"])
+def test_partitioned_totals_match_serial_with_time_of_day(by):
+    df = timestamped_frame()
+    totals = PartitionedTotals(df, workers=2, partitions=3, by=by)
+    pd.testing.assert_frame_equal(totals.category_aggregates(), core.aggregate_by_category(df), check_exact=True)
+
+
+@pytest.mark.parametrize("by", ["rows", "category"])
+def test_partitioned_totals_match_serial_encoded(by):
+    encoded = core.encode_feedback(timestamped_frame())
+    totals = PartitionedTotals(encoded, workers=2, partitions=3, by=by)
+    pd.testing.assert_frame_equal(totals.category_aggregates(), core.aggregate_by_category(encoded), check_exact=True)
+    pd.testing.assert_frame_equal(totals.category_sentiment_counts(),
+                                  FeedbackCube(encoded).category_sentiment_counts())
+
+
+def test_calculate_priority_score_workers_match_serial():
+    df = timestamped_frame()
+    now = pd.Timestamp("2026-10-02 12:00")
+    serial = core.score_categories(core.aggregate_by_category(df), now=now)
+    parallel = core.score_categories(PartitionedTotals(df, workers=2).category_aggregates(), now=now)
+    pd.testing.assert_frame_equal(parallel, serial)
+    pd.testing.assert_frame_equal(core.calculate_priority_score(df, workers=2), core.calculate_priority_score(df))
+
+
+def test_parallel_file_aggregates_match_serial(tmp_path):
+    path = tmp_path / "feedback.csv"
+    timestamped_frame().to_csv(path, index=False)
+    serial = core.load_category_aggregates(str(path))
+    merged = parallel_file_aggregates(str(path), workers=2, partitions=4)
+    pd.testing.assert_frame_equal(merged, serial, check_exact=True)